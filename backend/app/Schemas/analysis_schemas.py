@@ -0,0 +1,47 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import List, Optional
+
+
+class DropEvent(BaseModel):
+    unit_id:int
+    unit_code:Optional[str]
+    plant_id:int
+    plant_name:str
+    state:Optional[str]
+    start_ts:datetime
+    end_ts:datetime
+    blocks:int
+    expected_mwh:float
+    actual_mwh:float
+    lost_mwh:float
+    capacity_mw:Optional[float]
+
+
+class DropAnalysisResponse(BaseModel):
+    start:date
+    end:date
+    threshold:float
+    baseline_days:int
+    units_analyzed:int
+    readings:int
+    events:List[DropEvent]
+
+
+class RollupRow(BaseModel):
+    period:date
+    state:Optional[str] = None
+    district:Optional[str] = None
+    power_source:Optional[str] = None
+    plant_id:Optional[int] = None
+    unit_id:Optional[int] = None
+    generation_mwh:float
+    capacity_mwh:float
+    plf:Optional[float]
+    coverage:float
+
+
+class RollupResponse(BaseModel):
+    period:str
+    group_by:List[str]
+    rows:List[RollupRow]
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Dict, Any,Optional
+from datetime import datetime
 
 class UploadResponse(BaseModel):
     success: bool
@@ -11,6 +12,7 @@ class UploadResponse(BaseModel):
     rows_inserted:int
     duplicate_rows:int
     message:str
+    batches: List[int] = []
 
 
 class FileUPloadResponse(BaseModel):
@@ -29,4 +31,58 @@ class PreviewResponse(BaseModel):
     invalid_rows:int
     duplicate_rows:int
     preview_data:List[Dict[str,Any]]
-    message:str        
\ No newline at end of file
+    preview_token:Optional[str] = None
+    message:str        
+
+class JobAcceptedResponse(BaseModel):
+    file_id:int
+    filename:str
+    status:str
+    message:str
+    rows_inserted:Optional[int] = None
+
+
+class StageTiming(BaseModel):
+    stage:str
+    seconds:Optional[float]
+    rows:Optional[int]
+    calls:Optional[int]
+    peak_rss_mb:Optional[int]
+    class Config:
+        from_attributes=True
+
+
+class JobStatusResponse(BaseModel):
+    file_id:int
+    filename:str
+    data_category:Optional[str]
+    status:Optional[str]
+    rows_processed:int
+    rows_inserted:int
+    rows_per_second:Optional[float]
+    file_size_kb:Optional[int]
+    content_hash:Optional[str]
+    uploaded_at:Optional[datetime]
+    started_at:Optional[datetime]
+    finished_at:Optional[datetime]
+    error_log:Optional[str]
+    stages:List[StageTiming] = []
+
+
+class BatchFileResult(BaseModel):
+    filename:str
+    file_id:int
+    status:str
+    message:str
+    rows_inserted:Optional[int] = 0
+    duplicate_rows:int = 0
+    failed:int = 0
+    errors:List[str] = []
+
+
+class BatchUploadResponse(BaseModel):
+    data_type:str
+    total_files:int
+    rows_inserted:int
+    failed_files:int
+    files:List[BatchFileResult]
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from datetime import date
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 
 
 class PlantCreate(BaseModel):
@@ -69,5 +69,53 @@ class PlantResponse(BaseModel):
     plant_id: int
     plant_name: str
     plant_code: Optional[str] 
+    type_id: Optional[int] = None
+    state: Optional[str] = None
+    district: Optional[str] = None
+    status: Optional[str] = None
+    installed_capacity_mw: Optional[Decimal] = None
+    class Config:
+        from_attributes = True
+
+
+class UnitResponse(BaseModel):
+    unit_id: int
+    plant_id: Optional[int] = None
+    unit_code: Optional[str] = None
+    unit_capacity_mw: Optional[Decimal] = None
+    commissioning_date: Optional[date] = None
+    status: Optional[str] = None
     class Config:
         from_attributes = True   
+
+
+class CapacitySummaryRow(BaseModel):
+    state: Optional[str] = None
+    district: Optional[str] = None
+    sector: Optional[str] = None
+    power_source: Optional[str] = None
+    fuel_type: Optional[str] = None
+    plants: int
+    units: Optional[int] = None
+    total_mw: float
+    renewable_mw: Optional[float] = None
+    non_renewable_mw: Optional[float] = None
+
+
+class CapacitySummaryResponse(BaseModel):
+    group_by: List[str]
+    basis: str
+    total_mw: float
+    rows: List[CapacitySummaryRow]
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    errors: List[str] = []
+
+
+class BatchCreateResponse(BaseModel):
+    inserted: int
+    failed: int
+    results: List[BatchItemResult]
@@ -0,0 +1,131 @@
+import argparse
+from datetime import date
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.models.generation_model import month_partitions, next_month, month_partition_clause
+
+
+# monthly partition upkeep for generation_reading (MySQL only), run from
+# the backend folder:
+#   python -m app.commands.generation_partitions --convert
+#       re-partitions a table created with the old HASH (MONTH()) scheme
+#   python -m app.commands.generation_partitions --through 2028-12-01
+#       splits p_future into one partition per month up to that month
+#   python -m app.commands.generation_partitions --drop-before 2021-01-01
+#       drops the readings of every month before that one (rollups stay)
+
+
+TABLE = "generation_reading"
+
+
+def _partitions(db):
+
+    # (name, method) in partition order
+    return db.execute(
+        text(
+            "SELECT PARTITION_NAME, PARTITION_METHOD "
+            "FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        ),
+        {"table": TABLE}
+    ).all()
+
+
+def _month_of(name):
+
+    return date(int(name[1:5]), int(name[5:7]), 1)
+
+
+def convert(db):
+
+    db.execute(text(f"ALTER TABLE {TABLE} PARTITION BY {month_partition_clause()}"))
+
+
+def extend(db, partitions, through):
+
+    months = [_month_of(name) for name, _ in partitions if name[1:].isdigit()]
+
+    start = next_month(max(months)) if months else through.replace(day=1)
+
+    added = month_partitions(start, next_month(through))
+
+    if not added:
+        return 0
+
+    db.execute(text(
+        f"ALTER TABLE {TABLE} REORGANIZE PARTITION p_future INTO ("
+        + ", ".join(added + ["PARTITION p_future VALUES LESS THAN MAXVALUE"])
+        + ")"
+    ))
+
+    return len(added)
+
+
+def drop_before(db, partitions, before):
+
+    # p_history (readings before GENERATION_PARTITION_START) is left
+    # alone, only whole months go
+    names = [
+        name for name, _ in partitions
+        if name[1:].isdigit() and _month_of(name) < before.replace(day=1)
+    ]
+
+    if not names:
+        return 0
+
+    db.execute(text(f"ALTER TABLE {TABLE} DROP PARTITION {', '.join(names)}"))
+
+    return len(names)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Maintain the monthly partitions of generation_reading")
+
+    parser.add_argument("--convert", action="store_true", help="re-partition a HASH-partitioned table by month")
+    parser.add_argument("--through", type=date.fromisoformat, help="add monthly partitions up to this month")
+    parser.add_argument("--drop-before", type=date.fromisoformat, help="drop the monthly partitions before this month")
+
+    args = parser.parse_args()
+
+    if not (args.convert or args.through or args.drop_before):
+        parser.error("nothing to do: give --convert, --through or --drop-before")
+
+    db = SessionLocal()
+
+    try:
+
+        if db.get_bind().dialect.name != "mysql":
+            parser.error("partitions only exist on MySQL")
+
+        partitions = _partitions(db)
+
+        if args.convert:
+
+            if partitions and partitions[0][1] == "RANGE":
+                print(f"{TABLE} is already range partitioned")
+            else:
+                convert(db)
+                print(f"Re-partitioned {TABLE} by month")
+
+            partitions = _partitions(db)
+
+        elif partitions and partitions[0][1] != "RANGE":
+            parser.error(f"{TABLE} still uses the old partitioning, run with --convert first")
+
+        if args.through:
+            print(f"Added {extend(db, partitions, args.through)} monthly partition(s)")
+            partitions = _partitions(db)
+
+        if args.drop_before:
+            print(f"Dropped {drop_before(db, partitions, args.drop_before)} monthly partition(s)")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
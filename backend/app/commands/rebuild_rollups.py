@@ -0,0 +1,40 @@
+import argparse
+from datetime import date, timedelta
+
+from app.core.database import Base, SessionLocal, get_engine
+from app.services.rollup_service import rebuild_rollups
+
+
+# backfill for the generation rollups, run from the backend folder:
+#   python -m app.commands.rebuild_rollups --start 2024-01-01 --end 2024-03-31
+# end is inclusive; --unit limits the rebuild to some units
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Rebuild daily and monthly generation rollups")
+
+    parser.add_argument("--start", type=date.fromisoformat, required=True)
+    parser.add_argument("--end", type=date.fromisoformat, required=True)
+    parser.add_argument("--unit", type=int, action="append", dest="unit_ids")
+
+    args = parser.parse_args()
+
+    if args.end < args.start:
+        parser.error("--end must not be before --start")
+
+    Base.metadata.create_all(bind=get_engine())
+
+    db = SessionLocal()
+
+    try:
+        months = rebuild_rollups(db, args.start, args.end + timedelta(days=1), args.unit_ids)
+
+    finally:
+        db.close()
+
+    print(f"Rebuilt rollups for {months} month(s) from {args.start} to {args.end}")
+
+
+if __name__ == "__main__":
+    main()
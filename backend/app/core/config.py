@@ -5,12 +5,92 @@ from pathlib import Path
 # Get backend root path
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
-# Load .env from backend folder
-load_dotenv(BASE_DIR / ".env")
+# Load .env from the app folder, the one file every setting comes from
+load_dotenv(BASE_DIR / "app" / ".env")
 
-DB_HOST = os.getenv("DB_HOST")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_NAME = os.getenv("DB_NAME")
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "3306")
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "generation_drop_analysis")
 
-print("DB_HOST:", DB_HOST)   # TEMP DEBUG
+# a full SQLAlchemy URL wins over the DB_* parts, e.g.
+# sqlite:///./local.db for local and test runs
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# connection pool: size it for the concurrent sessions one process can
+# hold, i.e. the request threadpool in use plus INGESTION_WORKERS jobs;
+# recycle below the server's wait_timeout, pre-ping drops dead
+# connections before a request gets one
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# per-statement limit in milliseconds, 0 for none; MySQL applies it to
+# SELECTs (max_execution_time), PostgreSQL to every statement
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+# rows per multi-row INSERT issued by the bulk upload path
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "1000"))
+
+# rows per DataFrame chunk when an upload is streamed
+UPLOAD_CHUNK_ROWS = int(os.getenv("UPLOAD_CHUNK_ROWS", "10000"))
+
+# xlsx reader backend. "openpyxl" (read-only mode) streams rows, so an
+# upload's memory stays bounded by UPLOAD_CHUNK_ROWS. "calamine"
+# (python-calamine) is several times faster but holds a whole sheet in
+# memory, so memory grows with the file; opt in only where uploads are
+# known to be small. "auto" picks calamine when it is installed
+EXCEL_ENGINE = os.getenv("EXCEL_ENGINE", "openpyxl")
+
+# background ingestion: where accepted files are spooled and how many
+# files are processed at once
+UPLOAD_SPOOL_DIR = Path(os.getenv("UPLOAD_SPOOL_DIR", BASE_DIR / "uploads"))
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+# at startup, PROCESSING logs uploaded more than this many minutes ago
+# are failed as interrupted; 0 means every one left by earlier runs
+INGESTION_STALE_MINUTES = int(os.getenv("INGESTION_STALE_MINUTES", "0"))
+
+# batch uploads: worker processes that parse and validate files in
+# parallel ahead of the single write phase
+BATCH_PARSE_WORKERS = int(os.getenv("BATCH_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# parsed previews kept for /confirm, bounded by count, size and age
+PREVIEW_CACHE_MAX_ENTRIES = int(os.getenv("PREVIEW_CACHE_MAX_ENTRIES", "16"))
+PREVIEW_CACHE_MAX_MB = int(os.getenv("PREVIEW_CACHE_MAX_MB", "256"))
+PREVIEW_CACHE_TTL_SECONDS = int(os.getenv("PREVIEW_CACHE_TTL_SECONDS", "900"))
+# capacity summaries are cached until the master tables change; the TTL
+# only bounds how long an unused entry lingers
+CAPACITY_CACHE_MAX_ENTRIES = int(os.getenv("CAPACITY_CACHE_MAX_ENTRIES", "64"))
+CAPACITY_CACHE_TTL_SECONDS = int(os.getenv("CAPACITY_CACHE_TTL_SECONDS", "3600"))
+# keyset-paginated master listings
+MASTER_PAGE_SIZE = int(os.getenv("MASTER_PAGE_SIZE", "100"))
+MASTER_PAGE_MAX = int(os.getenv("MASTER_PAGE_MAX", "1000"))
+# process-local cache of master listings, bounded by pages, total rows
+# and age; writes in this process clear it, the TTL bounds how stale
+# another worker process can be
+MASTER_CACHE_MAX_ENTRIES = int(os.getenv("MASTER_CACHE_MAX_ENTRIES", "256"))
+MASTER_CACHE_MAX_ROWS = int(os.getenv("MASTER_CACHE_MAX_ROWS", "200000"))
+MASTER_CACHE_TTL_SECONDS = int(os.getenv("MASTER_CACHE_TTL_SECONDS", "300"))
+# most records one POST /master/plants/batch or /master/units/batch call
+# may carry
+MASTER_BATCH_MAX = int(os.getenv("MASTER_BATCH_MAX", "5000"))
+
+# units per grid in the drop analysis; each grid holds about ten
+# float arrays of units x days x 96 blocks
+DROP_ANALYSIS_UNIT_BATCH = int(os.getenv("DROP_ANALYSIS_UNIT_BATCH", "200"))
+
+# rows fetched per round trip by the streaming exports
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+
+# MySQL range partitions of generation_reading: older readings share one
+# history partition, each month from here on gets its own
+GENERATION_PARTITION_START = os.getenv("GENERATION_PARTITION_START", "2020-01-01")
+
+# SQL logging and instrumentation: echo logs every statement (off by
+# default); a request or ingestion job that runs the same statement
+# shape more than QUERY_REPEAT_WARN times is logged as a likely N+1
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+QUERY_REPEAT_WARN = int(os.getenv("QUERY_REPEAT_WARN", "20"))
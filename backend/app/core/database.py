@@ -1,22 +1,160 @@
-import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
-from dotenv import load_dotenv
 
-load_dotenv()
+from app.core.config import (
+    DATABASE_URL,
+    DB_HOST,
+    DB_PORT,
+    DB_USER,
+    DB_PASSWORD,
+    DB_NAME,
+    DB_ECHO,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_TIMEOUT_MS
+)
 
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "3306")
-DB_USER = os.getenv("DB_USER", "root")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "")
-DB_NAME = os.getenv("DB_NAME", "generation_drop_analysis")
 
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+def database_url():
 
-print("DATABASE_URL:", DATABASE_URL)  # DEBUG
+    if DATABASE_URL:
+        return DATABASE_URL
 
-engine = create_engine(DATABASE_URL, echo=True)
+    # built as a URL object so passwords need no escaping
+    return URL.create(
+        "mysql+pymysql",
+        username=DB_USER,
+        password=DB_PASSWORD,
+        host=DB_HOST,
+        port=int(DB_PORT),
+        database=DB_NAME
+    )
+
+
+# ============================
+# ENGINE
+# ============================
+
+def _set_statement_timeout(engine, timeout_ms):
+
+    backend = engine.dialect.name
+
+    if backend == "mysql":
+        statement = f"SET SESSION max_execution_time = {timeout_ms}"
+    elif backend == "postgresql":
+        statement = f"SET statement_timeout = {timeout_ms}"
+    else:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+
+        cursor = dbapi_connection.cursor()
+
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def make_engine(url=None, **overrides):
+
+    # engine for url (the configured database by default) with the
+    # pool settings from config; overrides go straight to create_engine
+    url = make_url(url or database_url())
+
+    options = {
+        "echo": DB_ECHO,
+        "pool_pre_ping": DB_POOL_PRE_PING
+    }
+
+    if url.get_backend_name() == "sqlite":
+
+        # sessions hop threads in FastAPI's pool; wait out writer locks
+        options["connect_args"] = {"check_same_thread": False, "timeout": 30}
+
+        # in-memory databases live in one connection, no pool to size
+        if url.database in (None, "", ":memory:"):
+            options.pop("pool_pre_ping")
+
+        else:
+            options["pool_size"] = DB_POOL_SIZE
+            options["max_overflow"] = DB_MAX_OVERFLOW
+            options["pool_timeout"] = DB_POOL_TIMEOUT
+
+    else:
+        options["pool_size"] = DB_POOL_SIZE
+        options["max_overflow"] = DB_MAX_OVERFLOW
+        options["pool_timeout"] = DB_POOL_TIMEOUT
+        options["pool_recycle"] = DB_POOL_RECYCLE
+
+    options.update(overrides)
+
+    engine = create_engine(url, **options)
+
+    if DB_STATEMENT_TIMEOUT_MS:
+        _set_statement_timeout(engine, DB_STATEMENT_TIMEOUT_MS)
+
+    return engine
+
+
+class _SessionFactory(sessionmaker):
+
+    # builds the configured engine on the first session rather than at
+    # import, so a script that binds its own engine (benchmarks on
+    # SQLite) never loads the MySQL driver
+
+    def __call__(self, **local_kw):
+
+        if self.kw.get("bind") is None:
+            get_engine()
+
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _SessionFactory()
+
+_engine = None
+
+
+def bind_engine(new_engine):
+
+    # every later session and get_engine() use new_engine
+    global _engine
+
+    _engine = new_engine
+
+    SessionLocal.configure(bind=new_engine)
+
+    return new_engine
+
+
+def get_engine():
+
+    if _engine is None:
+        bind_engine(make_engine())
+
+    return _engine
 
-SessionLocal = sessionmaker(bind=engine)
 
 Base = declarative_base()
+
+
+# ============================
+# SESSION DEPENDENCY
+# ============================
+
+# shared by every router, so all requests draw from the one pool above
+def get_db():
+
+    db = SessionLocal()
+
+    try:
+        yield db
+
+    finally:
+        db.close()
@@ -0,0 +1,125 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import re
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import QUERY_REPEAT_WARN
+
+logger = logging.getLogger(__name__)
+
+
+# ============================
+# PER-SCOPE QUERY STATS
+# ============================
+
+# the stats of the request or job running in this context, if any
+_current = ContextVar("query_stats", default=None)
+
+# "IN (%s, %s, %s)" and friends collapse to one shape whatever the list
+# length, so a chunked lookup counts as the same statement
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?|%\(\w+\)s)(?:\s*,\s*(?:%s|\?|%\(\w+\)s))*\s*\)")
+
+# an IN list of several values, or several VALUES / IN tuples: the
+# statement already covers many rows at once
+_MANY_ROWS = re.compile(
+    r"\bIN\s*\(\s*(?:%s|\?|%\(\w+\)s)\s*,"
+    r"|\)\s*,\s*\(\s*(?:%s|\?|%\(\w+\)s)",
+    re.IGNORECASE
+)
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+
+    return _SPACES.sub(" ", _PLACEHOLDER_LIST.sub("(?)", statement)).strip()
+
+
+def is_batched(statement, executemany):
+
+    return executemany or _MANY_ROWS.search(statement) is not None
+
+
+class QueryStats:
+
+    def __init__(self):
+
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+
+    def record(self, statement, seconds, batched=False):
+
+        # batched statements (executemany, chunked IN lookups, multi-row
+        # inserts) are counted and timed but never make an N+1: repeating
+        # them is how a large load is meant to run
+        self.count += 1
+        self.seconds += seconds
+
+        if not batched:
+            self.shapes[statement_shape(statement)] += 1
+
+
+    def repeated(self, threshold=QUERY_REPEAT_WARN):
+
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+@contextmanager
+def track_queries(label):
+
+    # counts every statement run in this context until the block exits,
+    # then logs a summary and any repeated statement shape
+    stats = QueryStats()
+
+    token = _current.set(stats)
+
+    try:
+        yield stats
+
+    finally:
+
+        _current.reset(token)
+
+        for shape, n in stats.repeated():
+            logger.warning(
+                "%s ran the same statement %d times (possible N+1): %.200s",
+                label, n, shape
+            )
+
+        logger.debug(
+            "%s: %d statements, %.1f ms in the database",
+            label, stats.count, stats.seconds * 1000
+        )
+
+
+# ============================
+# ENGINE EVENTS
+# ============================
+
+# registered on the Engine class, so every engine is covered
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+
+    stats = _current.get()
+
+    if stats is None or context is None:
+        return
+
+    started = getattr(context, "_query_started", None)
+
+    if started is not None:
+        stats.record(statement, time.perf_counter() - started, is_batched(statement, executemany))
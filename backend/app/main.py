@@ -1,12 +1,18 @@
-from fastapi import FastAPI
-from app.core.database import Base, engine
+from fastapi import FastAPI, Request
+from app.core.database import Base, get_engine
+from app.core.query_stats import track_queries
 from app.routes import master_setup
 from fastapi.middleware.cors import CORSMiddleware
 from app.models.master_model import Plant, Unit, PlantType
+from app.models.generation_model import GenerationReading
 from app.routes import mas_upload
+from app.routes import analysis
+from app.routes import metrics
+from app.services.ingestion_jobs import shutdown_ingestion_workers, recover_interrupted_jobs
+from app.services.batch_upload_service import shutdown_batch_workers
 app = FastAPI()
 
-Base.metadata.create_all(bind=engine)
+Base.metadata.create_all(bind=get_engine())
 
 
 
@@ -16,7 +22,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-DB-Query-Count", "X-DB-Time-Ms"],
 )
 
+# statement count and DB time of each request, as response headers;
+# repeated statements are logged by track_queries
+@app.middleware("http")
+async def count_queries(request: Request, call_next):
+
+    with track_queries(f"{request.method} {request.url.path}") as stats:
+        response = await call_next(request)
+
+    response.headers["X-DB-Query-Count"] = str(stats.count)
+    response.headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.1f}"
+
+    return response
+
+
 app.include_router(master_setup.router)
-app.include_router(mas_upload.router)
\ No newline at end of file
+app.include_router(mas_upload.router)
+app.include_router(analysis.router)
+app.include_router(metrics.router)
+
+
+@app.on_event("startup")
+def fail_interrupted_jobs():
+    recover_interrupted_jobs()
+
+
+@app.on_event("shutdown")
+def stop_ingestion_workers():
+    shutdown_ingestion_workers()
+    shutdown_batch_workers()
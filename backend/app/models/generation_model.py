@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+
+from sqlalchemy import Column, Date, DateTime, Integer, String, DECIMAL
+from app.core.config import GENERATION_PARTITION_START
+from app.core.database import Base
+
+
+# ============================
+# MONTHLY PARTITIONS (MySQL)
+# ============================
+
+def next_month(day):
+
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def month_partitions(start, end):
+
+    # one RANGE partition per calendar month in [start, end), named
+    # pYYYYMM so old months can be dropped by name
+    partitions = []
+
+    month = start.replace(day=1)
+
+    while month < end:
+
+        following = next_month(month)
+
+        partitions.append(
+            f"PARTITION p{month:%Y%m} VALUES LESS THAN (TO_DAYS('{following:%Y-%m-%d}'))"
+        )
+
+        month = following
+
+    return partitions
+
+
+def month_partition_clause():
+
+    # history below the start month, months through the end of next
+    # year, and a catch-all that app.commands.generation_partitions
+    # splits into months as time moves on
+    start = date.fromisoformat(GENERATION_PARTITION_START).replace(day=1)
+    end = date(date.today().year + 2, 1, 1)
+
+    partitions = [
+        f"PARTITION p_history VALUES LESS THAN (TO_DAYS('{start:%Y-%m-%d}'))",
+        *month_partitions(start, end),
+        "PARTITION p_future VALUES LESS THAN MAXVALUE"
+    ]
+
+    return "RANGE (TO_DAYS(reading_ts)) (" + ", ".join(partitions) + ")"
+
+
+class GenerationReading(Base):
+
+    # one row per unit per 15-minute block
+    # MySQL range-partitions by month, so a date-range query only opens
+    # the months it covers and a retired month is a DROP PARTITION;
+    # partitioned InnoDB tables cannot carry foreign keys, so unit_id is
+    # not declared as one and every unique key must include reading_ts
+    __tablename__ = "generation_reading"
+
+    __table_args__ = {
+        "mysql_partition_by": month_partition_clause()
+    }
+
+    unit_id = Column(Integer, primary_key=True, autoincrement=False)
+
+    reading_ts = Column(DateTime, primary_key=True)
+
+    generation_mwh = Column(DECIMAL(12,3))
+
+
+class GenerationDailyRollup(Base):
+
+    # one row per unit per day, refreshed for the unit-days a generation
+    # upload touches; plant and type attributes are copied in so
+    # dashboards group without joining back to the masters
+    __tablename__ = "generation_daily_rollup"
+
+    rollup_date = Column(Date, primary_key=True)
+
+    unit_id = Column(Integer, primary_key=True, autoincrement=False)
+
+    plant_id = Column(Integer, index=True)
+
+    state = Column(String(50), index=True)
+
+    district = Column(String(50))
+
+    power_source = Column(String(50))
+
+    generation_mwh = Column(DECIMAL(14,3))
+
+    # unit_capacity_mw x 24 hours, the PLF denominator
+    capacity_mwh = Column(DECIMAL(14,3))
+
+    # readings behind the row, out of BLOCKS_PER_DAY
+    blocks = Column(Integer)
+
+
+class GenerationMonthlyRollup(Base):
+
+    # the daily rollup summed per unit per month; month holds the first
+    # day of the month
+    __tablename__ = "generation_monthly_rollup"
+
+    month = Column(Date, primary_key=True)
+
+    unit_id = Column(Integer, primary_key=True, autoincrement=False)
+
+    plant_id = Column(Integer, index=True)
+
+    state = Column(String(50), index=True)
+
+    district = Column(String(50))
+
+    power_source = Column(String(50))
+
+    generation_mwh = Column(DECIMAL(16,3))
+
+    # unit capacity over every day of the month
+    capacity_mwh = Column(DECIMAL(16,3))
+
+    # days with readings, and the readings themselves
+    days = Column(Integer)
+
+    blocks = Column(Integer)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, TIMESTAMP,Integer,Text, String, Date, Enum, ForeignKey, DECIMAL ,Boolean
+from sqlalchemy import Column, TIMESTAMP,Integer,Text, String, Date, Enum, ForeignKey, DECIMAL ,Boolean, Float
 from app.core.database import Base
 import enum
 
@@ -18,19 +18,21 @@ class Plant(Base):
 
     plant_name = Column(String(100), nullable=False)
 
-    type_id =Column(Integer, ForeignKey("plant_type_master.type_id"))
+    # listing filters; InnoDB secondary indexes carry the primary key, so
+    # each one also serves "filter, then page on plant_id"
+    type_id =Column(Integer, ForeignKey("plant_type_master.type_id"), index=True)
 
     location = Column(String(100))
 
-    district = Column(String(50))
+    district = Column(String(50), index=True)
 
-    state = Column(String(50))
+    state = Column(String(50), index=True)
 
     commissioning_date = Column(Date)
 
     retirement_date = Column(Date)
 
-    status = Column(Enum(PlantStatus))
+    status = Column(Enum(PlantStatus), index=True)
 
     installed_capacity_mw = Column(DECIMAL(10,2))
 
@@ -49,7 +51,7 @@ class Unit(Base):
 
     unit_id = Column(Integer, primary_key=True)
 
-    plant_id = Column(Integer, ForeignKey("plant_master.plant_id"))
+    plant_id = Column(Integer, ForeignKey("plant_master.plant_id"), index=True)
 
     unit_code = Column(String(50))
 
@@ -57,7 +59,7 @@ class Unit(Base):
 
     commissioning_date = Column(Date)
 
-    status = Column(Enum(UnitStatus))
+    status = Column(Enum(UnitStatus), index=True)
 
 
 class PlantType(Base):
@@ -87,9 +89,27 @@ class FileIngestionLog(Base):
     filename=Column( String(255), nullable=False)
     storage_path=Column(String(512))
     file_size_kb=Column(Integer)
+    content_hash=Column(String(64), index=True)
     rows_inserted=Column(Integer ,default=0)
+    rows_processed=Column(Integer ,default=0)
     status=Column(Enum(UploadStatus), default=UploadStatus.PROCESSING)
     data_category=Column(String(100))
     error_log=Column(Text)
     uploaded_by=Column(String(100))
-    uploaded_at=Column(TIMESTAMP)
\ No newline at end of file
+    uploaded_at=Column(TIMESTAMP)
+    started_at=Column(TIMESTAMP)
+    finished_at=Column(TIMESTAMP)
+
+
+class FileIngestionStage(Base):
+    # per-stage timing of one ingestion (read, normalize, validate,
+    # dedup, insert, commit, ...), summed over its chunks
+    __tablename__= "file_ingestion_stage"
+
+    stage_id=Column(Integer,primary_key=True ,autoincrement=True)
+    file_id=Column(Integer, ForeignKey("file_ingestion_log.file_id"), index=True, nullable=False)
+    stage=Column(String(50), nullable=False)
+    seconds=Column(Float)
+    rows=Column(Integer)
+    calls=Column(Integer)
+    peak_rss_mb=Column(Integer)
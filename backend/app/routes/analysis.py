@@ -0,0 +1,102 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+
+from app.Schemas.analysis_schemas import DropAnalysisResponse, RollupResponse
+
+from app.services.drop_analysis_service import (
+    detect_drops,
+    DROP_THRESHOLD,
+    BASELINE_DAYS
+)
+from app.services.rollup_service import get_rollups, GROUP_COLUMNS, ROLLUP_MODELS
+
+router = APIRouter(
+    prefix="/analysis",
+    tags=["Analysis"]
+)
+
+
+# the grid is units x 15-minute blocks; units go through it in batches
+# of DROP_ANALYSIS_UNIT_BATCH and the span is capped, so one request
+# holds a bounded amount of memory however large the fleet
+MAX_RANGE_DAYS = 92
+
+
+# =========================
+# GENERATION DROPS
+# =========================
+
+@router.get("/drops", response_model=DropAnalysisResponse)
+def generation_drops(
+    start: date,
+    end: date,
+    plant_id: Optional[int] = None,
+    state: Optional[str] = None,
+    threshold: float = Query(DROP_THRESHOLD, gt=0, lt=1),
+    baseline_days: int = Query(BASELINE_DAYS, ge=1, le=31),
+    db: Session = Depends(get_db)
+):
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+
+    if (end - start).days + 1 > MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"date range is limited to {MAX_RANGE_DAYS} days"
+        )
+
+    result = detect_drops(db, start, end, plant_id, state, threshold, baseline_days)
+
+    return {
+        "start": start,
+        "end": end,
+        "threshold": threshold,
+        "baseline_days": baseline_days,
+        **result
+    }
+
+
+# =========================
+# GENERATION ROLLUPS
+# =========================
+
+@router.get("/rollups", response_model=RollupResponse)
+def generation_rollups(
+    start: date,
+    end: date,
+    period: str = "daily",
+    group_by: str = "state",
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    power_source: Optional[str] = None,
+    plant_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    # group_by is a comma separated list, e.g. state,power_source
+    if period not in ROLLUP_MODELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"period must be one of {', '.join(ROLLUP_MODELS)}"
+        )
+
+    groups = [name.strip() for name in group_by.split(",") if name.strip()]
+
+    unknown = [name for name in groups if name not in GROUP_COLUMNS]
+
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"group_by must use {', '.join(GROUP_COLUMNS)}"
+        )
+
+    rows = get_rollups(db, period, groups, start, end, state, district, power_source, plant_id)
+
+    return {
+        "period": period,
+        "group_by": groups,
+        "rows": rows
+    }
@@ -1,17 +1,28 @@
-from fastapi import APIRouter, UploadFile, File, Depends
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.core.database import SessionLocal
+from app.core.database import get_db
 
 # IMPORT SERVICE FUNCTIONS WITH DIFFERENT NAMES
 from app.services.mas_upload_services import (
-    upload_plants,
-    upload_units,
     preview_upload as preview_upload_service,
-    confirm_upload as confirm_upload_service
+    get_cached_preview
 )
+from app.services.ingestion_spec import SPECS
+from app.services.ingestion_jobs import (
+    submit_ingestion,
+    submit_cached_ingestion,
+    get_job_status
+)
+from app.services.batch_upload_service import batch_upload
 
-from app.Schemas.mas_upload_schemas import PreviewResponse, UploadResponse
+from app.Schemas.mas_upload_schemas import (
+    PreviewResponse,
+    JobAcceptedResponse,
+    JobStatusResponse,
+    BatchUploadResponse
+)
 
 # CREATE ONLY ONE ROUTER
 router = APIRouter(
@@ -20,40 +31,83 @@ router = APIRouter(
 )
 
 
-# =========================
-# DB DEPENDENCY
-# =========================
+def check_data_type(data_type: str):
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    if data_type not in SPECS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"data_type must be one of {', '.join(SPECS)}"
+        )
 
 
 # =========================
 # PLANT UPLOAD DIRECT
 # =========================
 
-@router.post("/plant", response_model=UploadResponse)
+@router.post("/plant", response_model=JobAcceptedResponse, status_code=202)
 def upload_plant_file(
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    return upload_plants(file, db)
+    return submit_ingestion(file, "plant", db)
 
 
 # =========================
 # UNIT UPLOAD DIRECT
 # =========================
 
-@router.post("/unit", response_model=UploadResponse)
+@router.post("/unit", response_model=JobAcceptedResponse, status_code=202)
 def upload_unit_file(
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    return upload_units(file, db)
+    return submit_ingestion(file, "unit", db)
+
+
+# =========================
+# GENERATION READINGS
+# =========================
+
+@router.post("/generation", response_model=JobAcceptedResponse, status_code=202)
+def upload_generation_file(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    # interval readings (unit_id, reading_ts, generation_mwh), streamed
+    # in chunks straight into batched inserts
+    return submit_ingestion(file, "generation", db)
+
+
+# =========================
+# PLANT + UNIT WORKBOOK
+# =========================
+
+@router.post("/workbook", response_model=JobAcceptedResponse, status_code=202)
+def upload_workbook_file(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    if not file.filename.lower().endswith((".xlsx", ".xlsm", ".xls")):
+        raise HTTPException(status_code=400, detail="Workbook upload expects an Excel file")
+
+    return submit_ingestion(file, "workbook", db)
+
+
+# =========================
+# MULTI-FILE BATCH
+# =========================
+
+@router.post("/batch", response_model=BatchUploadResponse)
+def upload_batch_files(
+    files: List[UploadFile] = File(...),
+    data_type: str = "plant",
+    db: Session = Depends(get_db)
+):
+    check_data_type(data_type)
+
+    # files are parsed in parallel, then written one after another; the
+    # response reports every file
+    return batch_upload(files, data_type, db)
 
 
 # =========================
@@ -66,6 +120,8 @@ def preview_file(
     data_type: str = "plant",
     db: Session = Depends(get_db)
 ):
+    check_data_type(data_type)
+
     return preview_upload_service(file, data_type, db)
 
 
@@ -73,10 +129,47 @@ def preview_file(
 # CONFIRM (SAVE AFTER PREVIEW)
 # =========================
 
-@router.post("/confirm", response_model=UploadResponse)
+@router.post("/confirm", response_model=JobAcceptedResponse, status_code=202)
 def confirm_file_upload(
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
     data_type: str = "plant",
+    preview_token: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    return confirm_upload_service(file, data_type, db)
\ No newline at end of file
+    check_data_type(data_type)
+
+    # a token from /preview skips the re-upload and the parse
+    if preview_token:
+
+        parsed = get_cached_preview(preview_token, data_type)
+
+        if parsed is not None:
+            return submit_cached_ingestion(parsed, data_type, db)
+
+        if file is None:
+            raise HTTPException(
+                status_code=410,
+                detail="Preview expired, upload the file again"
+            )
+
+    if file is None:
+        raise HTTPException(status_code=422, detail="file or preview_token is required")
+
+    return submit_ingestion(file, "confirm", db, data_type=data_type)
+
+
+# =========================
+# JOB STATUS
+# =========================
+
+@router.get("/jobs/{file_id}", response_model=JobStatusResponse)
+def ingestion_job_status(
+    file_id: int,
+    db: Session = Depends(get_db)
+):
+    job = get_job_status(db, file_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    return job
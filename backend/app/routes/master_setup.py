@@ -1,22 +1,49 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.database import SessionLocal
+from app.core.database import get_db
 
 from app.Schemas.master_schema import (
     PlantCreate,
     PlantTypeResponse, 
     UnitCreate,
-PlantResponse,  PlantTypeResponse )
+PlantResponse,
+    UnitResponse,
+    BatchCreateResponse,
+    CapacitySummaryResponse )
 
 from app.services.master_service import (
      create_plant,
      create_unit,
+     create_plants_batch,
+     create_units_batch,
      get_plants,
         get_units,
-        get_plant_types
+        get_plant_types,
+        PLANT_FIELDS,
+        UNIT_FIELDS,
+        PLANT_TYPE_FIELDS
 )
+from app.services.master_cache import master_cache, table_fingerprint
+from app.services.capacity_service import (
+    capacity_cache,
+    master_fingerprint,
+    get_capacity_summary,
+    CAPACITY_GROUPS,
+    CAPACITY_BASES
+)
+from app.services.export_service import (
+    export_stream,
+    export_filename,
+    parquet_available,
+    EXPORT_TABLES,
+    EXPORT_FORMATS
+)
+from app.core.config import MASTER_PAGE_SIZE, MASTER_PAGE_MAX, MASTER_BATCH_MAX
+from app.models.master_model import Plant, PlantStatus, PlantType, Unit, UnitStatus
+from app.utils.etag import make_etag, etag_matches
 
 router = APIRouter(
     prefix="/master",
@@ -25,18 +52,6 @@ router = APIRouter(
  
 
 
-def get_db():
-
-    db = SessionLocal()
-
-    try:
-        yield db
-
-    finally:
-        db.close()
-
-
-
 @router.post("/plant")
 
 def add_plant(
@@ -62,17 +77,241 @@ def add_unit(
 ):
 
     return create_unit(db, unit)
+def _check_batch(items):
+
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+
+    if len(items) > MASTER_BATCH_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch is limited to {MASTER_BATCH_MAX} records"
+        )
+
+
+@router.post("/plants/batch", response_model=BatchCreateResponse)
+def add_plants_batch(
+    plants: List[PlantCreate],
+    db: Session = Depends(get_db)
+):
+    # one transaction, multi-row INSERTs; results follow input order
+    _check_batch(plants)
+
+    return create_plants_batch(db, plants)
+
+
+@router.post("/units/batch", response_model=BatchCreateResponse)
+def add_units_batch(
+    units: List[UnitCreate],
+    db: Session = Depends(get_db)
+):
+    _check_batch(units)
+
+    return create_units_batch(db, units)
+
+
+def _not_modified(request: Request, response: Response, version):
+
+    # ETag from the table fingerprint and the query string; a matching
+    # If-None-Match gets a bare 304 before any listing query runs
+    etag = make_etag(request, version)
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+
+    return None
+
+
+def _paged(response: Response, page):
+
+    # the page arrives already encoded, so it goes out as-is instead of
+    # through response_model validation (the models still document the
+    # shape). Bodies stay plain lists; the cursor for the next page, if
+    # any, goes in a header (pass it back as ?after=)
+    body, _, next_cursor = page
+
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+
+    # a returned Response does not pick up headers set on the injected
+    # one (ETag, cursor), so they are carried over
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name != "content-length"
+    }
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _projection(fields, allowed):
+
+    # fields=plant_id,plant_name narrows a listing to those columns
+    if fields is None:
+        return None
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+
+    unknown = [name for name in names if name not in allowed]
+
+    if not names or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fields must use {', '.join(allowed)}"
+        )
+
+    return names
+
+
 @router.get("/plants", response_model=List[PlantResponse])
-def list_plants(db: Session = Depends(get_db)):
+def list_plants(
+    request: Request,
+    response: Response,
+    after: Optional[int] = None,
+    limit: int = Query(MASTER_PAGE_SIZE, ge=1, le=MASTER_PAGE_MAX),
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    type_id: Optional[int] = None,
+    status: Optional[PlantStatus] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+
+    columns = _projection(fields, PLANT_FIELDS)
+
+    version = table_fingerprint(db, Plant.plant_id)
+
+    not_modified = _not_modified(request, response, version)
+
+    if not_modified:
+        return not_modified
+
+    return _paged(response, get_plants(db, after, limit, state, district, type_id, status, version, columns))
+
+@router.get("/units", response_model=List[UnitResponse])
+def list_units(
+    request: Request,
+    response: Response,
+    after: Optional[int] = None,
+    limit: int = Query(MASTER_PAGE_SIZE, ge=1, le=MASTER_PAGE_MAX),
+    plant_id: Optional[int] = None,
+    status: Optional[UnitStatus] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+
+    columns = _projection(fields, UNIT_FIELDS)
 
-    return get_plants(db)
+    version = table_fingerprint(db, Unit.unit_id)
 
-@router.get("/units")
-def list_units(db: Session = Depends(get_db)):
+    not_modified = _not_modified(request, response, version)
 
-    return get_units(db)
+    if not_modified:
+        return not_modified
+
+    return _paged(response, get_units(db, after, limit, plant_id, status, version, columns))
 
 @router.get("/plant-types", response_model=List[PlantTypeResponse])
-def list_plant_types(db: Session = Depends(get_db)):
-    return get_plant_types(db)
+def list_plant_types(
+    request: Request,
+    response: Response,
+    after: Optional[int] = None,
+    limit: int = Query(MASTER_PAGE_SIZE, ge=1, le=MASTER_PAGE_MAX),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    columns = _projection(fields, PLANT_TYPE_FIELDS)
+
+    version = table_fingerprint(db, PlantType.type_id)
+
+    not_modified = _not_modified(request, response, version)
+
+    if not_modified:
+        return not_modified
+
+    return _paged(response, get_plant_types(db, after, limit, version, columns))
+
+
+@router.get(
+    "/capacity-summary",
+    response_model=CapacitySummaryResponse,
+    response_model_exclude_unset=True
+)
+def capacity_summary(
+    request: Request,
+    response: Response,
+    group_by: str = "state",
+    split_renewable: bool = False,
+    basis: str = "plant",
+    include_retired: bool = False,
+    db: Session = Depends(get_db)
+):
+    # group_by is a comma separated list, e.g. state,power_source
+    groups = [name.strip() for name in group_by.split(",") if name.strip()]
+
+    if not groups or any(name not in CAPACITY_GROUPS for name in groups):
+        raise HTTPException(
+            status_code=400,
+            detail=f"group_by must use {', '.join(CAPACITY_GROUPS)}"
+        )
+
+    if basis not in CAPACITY_BASES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"basis must be one of {', '.join(CAPACITY_BASES)}"
+        )
+
+    version = master_fingerprint(db)
+
+    not_modified = _not_modified(request, response, version)
+
+    if not_modified:
+        return not_modified
+
+    return get_capacity_summary(db, groups, split_renewable, basis, include_retired, version)
+
+
+@router.get("/export/{table}")
+def export_table(table: str, format: str = "ndjson"):
+
+    # full dump streamed straight from a server-side cursor; the body
+    # starts before the table has been read
+    if table not in EXPORT_TABLES:
+        raise HTTPException(
+            status_code=404,
+            detail=f"table must be one of {', '.join(EXPORT_TABLES)}"
+        )
+
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of {', '.join(EXPORT_FORMATS)}"
+        )
+
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=501,
+            detail="Parquet export needs pyarrow installed"
+        )
+
+    return StreamingResponse(
+        export_stream(table, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(table, format)}"'
+        }
+    )
+
+
+@router.get("/cache-stats")
+def cache_stats():
 
+    # per-process counters; each worker reports its own
+    return {
+        "master": master_cache.stats(),
+        "capacity": capacity_cache.stats()
+    }
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.ingestion_metrics import render_metrics
+
+router = APIRouter(
+    tags=["Metrics"]
+)
+
+
+# =========================
+# PROMETHEUS SCRAPE
+# =========================
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+
+    # text exposition format; counters are per worker process
+    return PlainTextResponse(
+        render_metrics(),
+        media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,263 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import threading
+
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+
+from app.core.config import BATCH_PARSE_WORKERS
+from app.models.master_model import UploadStatus
+from app.services.ingestion_spec import get_spec
+from app.services.validation_service import coerce_chunk
+from app.services.ingestion_jobs import spool_upload, release_spool
+from app.services.mas_upload_services import (
+    start_ingestion_log,
+    find_ingested_file,
+    begin_ingestion,
+    read_chunks,
+    new_totals,
+    load_typed,
+    _finish_load,
+    _fail_load
+)
+from app.utils.file_parser import iter_file_chunks
+from app.utils.stage_timer import StageTimer
+
+
+# =========================
+# PARSE POOL
+# =========================
+
+# spawned rather than forked: the parent holds DB connections and the
+# ingestion thread pool, neither of which survives a fork cleanly
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _parse_pool():
+
+    global _pool
+
+    with _pool_lock:
+
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=BATCH_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+        return _pool
+
+
+def _reset_parse_pool():
+
+    global _pool
+
+    with _pool_lock:
+
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+
+        _pool = None
+
+
+def shutdown_batch_workers():
+
+    _reset_parse_pool()
+
+
+# =========================
+# PARSE PHASE (WORKER PROCESS)
+# =========================
+
+def parse_spooled_file(path, filename, category):
+
+    # runs in a worker process: read, normalize and coerce every chunk
+    # without touching the database; returns the (typed, row_errors)
+    # pairs and the worker's stage timings
+    spec = get_spec(category)
+
+    timer = StageTimer()
+
+    parsed = []
+
+    with open(path, "rb") as f:
+
+        upload = UploadFile(file=f, filename=filename)
+
+        for df in read_chunks(iter_file_chunks(upload), spec, timer):
+
+            with timer.stage("validate", len(df)):
+                parsed.append(coerce_chunk(df, spec))
+
+    return {"chunks": parsed, "stages": timer.stages}
+
+
+# =========================
+# BATCH UPLOAD
+# =========================
+
+def _file_summary(filename, file_id, status, message, result=None):
+
+    result = result or {}
+
+    return {
+        "filename": filename,
+        "file_id": file_id,
+        "status": status,
+        "message": message,
+        "rows_inserted": result.get("inserted", 0),
+        "duplicate_rows": result.get("duplicate_rows", 0),
+        "failed": result.get("failed", 0),
+        "errors": result.get("errors", [])
+    }
+
+
+def _write_file(db: Session, spec, log, parsed):
+
+    # serialized write phase for one file, committed on its own so a bad
+    # file does not undo the ones before it
+    begin_ingestion(db, log)
+
+    totals = new_totals()
+
+    # the parse stages ran in a worker process
+    totals["timer"].merge(parsed["stages"])
+
+    try:
+
+        for typed, row_errors in parsed["chunks"]:
+            load_typed(db, spec, typed, row_errors, totals)
+
+        return _finish_load(db, log, totals)
+
+
+    except Exception as e:
+
+        _fail_load(db, log, totals)
+
+        raise e
+
+
+def batch_upload(upload_files, data_type: str, db: Session):
+
+    spec = get_spec(data_type)
+
+    summaries = []
+    pending = []
+
+    # spool and log every file first; byte-identical repeats of an
+    # earlier successful upload are answered without parsing
+    for upload_file in upload_files:
+
+        path, content_hash, size = spool_upload(upload_file)
+
+        previous = find_ingested_file(db, content_hash, data_type)
+
+        if previous is not None:
+
+            os.remove(path)
+
+            summaries.append(_file_summary(
+                previous.filename,
+                previous.file_id,
+                previous.status.value,
+                "Identical file already ingested",
+                {"inserted": previous.rows_inserted}
+            ))
+
+            continue
+
+        log = start_ingestion_log(
+            db,
+            upload_file.filename,
+            data_type,
+            storage_path=str(path),
+            file_size_kb=size // 1024,
+            content_hash=content_hash
+        )
+
+        summary = _file_summary(log.filename, log.file_id, log.status.value, "")
+
+        summaries.append(summary)
+        pending.append((summary, log, path))
+
+    # parse phase: at most BATCH_PARSE_WORKERS files are parsing or
+    # parsed-and-waiting besides the one being written, so the typed
+    # chunks the parent holds stay bounded whatever the size of the batch
+    waiting = iter(pending)
+    in_flight = deque()
+
+    def submit_next():
+
+        for summary, log, path in waiting:
+
+            args = (parse_spooled_file, str(path), log.filename, data_type)
+
+            try:
+                future = _parse_pool().submit(*args)
+            except BrokenProcessPool:
+                _reset_parse_pool()
+                future = _parse_pool().submit(*args)
+
+            in_flight.append((summary, log, path, future))
+
+            return
+
+    for _ in range(BATCH_PARSE_WORKERS):
+        submit_next()
+
+    rows_inserted = 0
+    failed_files = 0
+
+    # write phase: files go in one at a time, in the order given, while
+    # the next ones are being parsed
+    while in_flight:
+
+        summary, log, path, future = in_flight.popleft()
+
+        # keep the window full while this file is written
+        submit_next()
+
+        try:
+
+            parsed = future.result()
+
+            result = _write_file(db, spec, log, parsed)
+
+            summary.update(_file_summary(log.filename, log.file_id, "SUCCESS", "Upload completed", result))
+
+            rows_inserted += result["inserted"]
+
+
+        except Exception as e:
+
+            if isinstance(e, BrokenProcessPool):
+                _reset_parse_pool()
+
+            # a parse failure never reached _write_file, so the log is
+            # still PROCESSING
+            if log.status != UploadStatus.FAILED:
+                _fail_load(db, log)
+
+            summary.update(status="FAILED", message=str(e) or type(e).__name__)
+
+            failed_files += 1
+
+        finally:
+
+            # drop this file's chunks before waiting on the next one
+            parsed = None
+
+            release_spool(db, log.file_id, path)
+
+    return {
+        "data_type": data_type,
+        "files": summaries,
+        "total_files": len(summaries),
+        "rows_inserted": rows_inserted,
+        "failed_files": failed_files
+    }
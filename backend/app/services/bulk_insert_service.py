@@ -0,0 +1,55 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+import numpy as np
+import pandas as pd
+
+from app.core.config import BULK_INSERT_BATCH_SIZE
+
+
+# ============================
+# VALUE CLEANUP
+# ============================
+
+def clean_value(value):
+
+    # pandas hands back NaN / NaT and numpy scalars, the DB driver wants
+    # plain python values and None
+    if value is None:
+        return None
+
+    if not isinstance(value, (list, tuple, dict)) and pd.isna(value):
+        return None
+
+    if isinstance(value, np.generic):
+        return value.item()
+
+    return value
+
+
+def clean_row(row: dict):
+
+    return {key: clean_value(value) for key, value in row.items()}
+
+
+# ============================
+# BULK INSERT
+# ============================
+
+# sends row dicts as chunked executemany INSERTs and returns the number
+# of rows in each batch; the caller owns the transaction and commits
+
+def bulk_insert(db: Session, model, rows, batch_size: int = None):
+
+    batch_size = batch_size or BULK_INSERT_BATCH_SIZE
+
+    batches = []
+
+    for start in range(0, len(rows), batch_size):
+
+        batch = rows[start:start + batch_size]
+
+        db.execute(insert(model), batch)
+
+        batches.append(len(batch))
+
+    return batches
@@ -0,0 +1,119 @@
+from sqlalchemy import case, distinct, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import CAPACITY_CACHE_MAX_ENTRIES, CAPACITY_CACHE_TTL_SECONDS
+from app.models.master_model import Plant, PlantStatus, PlantType, Unit
+from app.utils.ttl_cache import TTLCache
+from app.services.master_cache import table_fingerprint
+
+
+# group_by name -> column
+CAPACITY_GROUPS = {
+    "state": Plant.state,
+    "district": Plant.district,
+    "sector": Plant.sector,
+    "power_source": PlantType.power_source,
+    "fuel_type": PlantType.fuel_type
+}
+
+# "plant" sums installed_capacity_mw, "unit" sums unit_capacity_mw
+CAPACITY_BASES = ("plant", "unit")
+
+
+# ============================
+# MASTER FINGERPRINT
+# ============================
+
+def master_fingerprint(db: Session):
+
+    # every master table the summary reads
+    return table_fingerprint(db, Plant.plant_id, Unit.unit_id, PlantType.type_id)
+
+
+# ============================
+# CAPACITY SUMMARY
+# ============================
+
+capacity_cache = TTLCache(
+    max_entries=CAPACITY_CACHE_MAX_ENTRIES,
+    ttl_seconds=CAPACITY_CACHE_TTL_SECONDS
+)
+
+
+def _summary_query(group_by, split_renewable, basis, include_retired):
+
+    groups = [CAPACITY_GROUPS[name].label(name) for name in group_by]
+
+    capacity = Plant.installed_capacity_mw if basis == "plant" else Unit.unit_capacity_mw
+
+    columns = [
+        *groups,
+        func.count(distinct(Plant.plant_id)).label("plants"),
+        func.coalesce(func.sum(capacity), 0).label("total_mw")
+    ]
+
+    if basis == "unit":
+        columns.append(func.count(Unit.unit_id).label("units"))
+
+    if split_renewable:
+
+        renewable = func.coalesce(PlantType.is_renewable, 0) == 1
+
+        columns.append(func.coalesce(func.sum(case((renewable, capacity), else_=0)), 0).label("renewable_mw"))
+        columns.append(func.coalesce(func.sum(case((renewable, 0), else_=capacity)), 0).label("non_renewable_mw"))
+
+    stmt = select(*columns).select_from(Plant)
+
+    if basis == "unit":
+        stmt = stmt.join(Unit, Unit.plant_id == Plant.plant_id)
+
+    stmt = stmt.outerjoin(PlantType, PlantType.type_id == Plant.type_id)
+
+    if not include_retired:
+        stmt = stmt.where(or_(Plant.status.is_(None), Plant.status != PlantStatus.RETIRED))
+
+    return stmt.group_by(*groups).order_by(*groups)
+
+
+def get_capacity_summary(
+    db: Session,
+    group_by,
+    split_renewable=False,
+    basis="plant",
+    include_retired=False,
+    version=None
+):
+
+    # version is master_fingerprint(db) when the caller already has it
+    if version is None:
+        version = master_fingerprint(db)
+
+    key = (version, tuple(group_by), split_renewable, basis, include_retired)
+
+    cached = capacity_cache.get(key)
+
+    if cached is not None:
+        return cached
+
+    rows = []
+
+    for row in db.execute(_summary_query(group_by, split_renewable, basis, include_retired)).mappings():
+
+        entry = dict(row)
+
+        for name in ("total_mw", "renewable_mw", "non_renewable_mw"):
+            if name in entry:
+                entry[name] = float(entry[name])
+
+        rows.append(entry)
+
+    summary = {
+        "group_by": list(group_by),
+        "basis": basis,
+        "total_mw": round(sum(row["total_mw"] for row in rows), 2),
+        "rows": rows
+    }
+
+    capacity_cache.set(key, summary)
+
+    return summary
@@ -0,0 +1,290 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import DROP_ANALYSIS_UNIT_BATCH
+from app.models.master_model import Plant, Unit
+from app.models.generation_model import GenerationReading
+
+
+# ============================
+# SETTINGS
+# ============================
+
+BLOCK_MINUTES = 15
+BLOCKS_PER_DAY = 24 * 60 // BLOCK_MINUTES
+
+# MWh a unit can put out in one block per MW of capacity
+BLOCK_HOURS = BLOCK_MINUTES / 60
+
+# baseline = mean of the same block over this many previous days, so a
+# solar unit at night is compared with earlier nights, not with noon
+BASELINE_DAYS = 7
+
+# a block counts once at least this many baseline days had a reading
+# (every day of a shorter baseline)
+MIN_BASELINE_DAYS = 3
+
+# flag a block when output falls below (1 - DROP_THRESHOLD) x baseline
+DROP_THRESHOLD = 0.5
+
+# ignore blocks where the unit normally runs below this share of its
+# capacity, and drops smaller than this share of capacity
+MIN_BASELINE_UTILISATION = 0.1
+MIN_DROP_UTILISATION = 0.1
+
+
+# ============================
+# LOAD READINGS
+# ============================
+
+def load_units(db: Session, plant_id=None, state=None):
+
+    # capacity and plant details of the units matching the filters, by
+    # unit_id
+    stmt = (
+        select(
+            Unit.unit_id,
+            Unit.unit_code,
+            Unit.unit_capacity_mw,
+            Plant.plant_id,
+            Plant.plant_name,
+            Plant.state
+        )
+        .join(Plant, Plant.plant_id == Unit.plant_id)
+        .order_by(Unit.unit_id)
+    )
+
+    if plant_id is not None:
+        stmt = stmt.where(Unit.plant_id == plant_id)
+
+    if state:
+        stmt = stmt.where(Plant.state == state)
+
+    return {row.unit_id: row for row in db.execute(stmt).all()}
+
+
+def load_readings(db: Session, start, end, unit_ids):
+
+    # readings of unit_ids from start up to end (exclusive), as flat
+    # arrays
+    stmt = (
+        select(
+            GenerationReading.unit_id,
+            GenerationReading.reading_ts,
+            GenerationReading.generation_mwh
+        )
+        .where(GenerationReading.unit_id.in_(unit_ids))
+        .where(GenerationReading.reading_ts >= start)
+        .where(GenerationReading.reading_ts < end)
+    )
+
+    readings = pd.read_sql(stmt, db.connection(), coerce_float=True)
+
+    return (
+        readings["unit_id"].to_numpy(dtype=np.int64),
+        pd.to_datetime(readings["reading_ts"]).to_numpy(dtype="datetime64[ns]"),
+        readings["generation_mwh"].to_numpy(dtype=np.float64)
+    )
+
+
+# ============================
+# GRID
+# ============================
+
+def build_grid(unit_ids, stamps, mwh, grid_start, days):
+
+    # one row per unit, one column per 15-minute block; blocks without a
+    # reading stay NaN
+    units, rows = np.unique(unit_ids, return_inverse=True)
+
+    offset = (stamps - np.datetime64(grid_start, "ns")) // np.timedelta64(BLOCK_MINUTES, "m")
+    columns = offset.astype(np.int64)
+
+    grid = np.full((len(units), days * BLOCKS_PER_DAY), np.nan)
+    grid[rows, columns] = mwh
+
+    return units, grid
+
+
+def rolling_baseline(grid, baseline_days=BASELINE_DAYS):
+
+    # mean of the same block over the previous baseline_days days, for
+    # every unit at once, from running sums along the day axis
+    n_units, n_blocks = grid.shape
+
+    by_day = grid.reshape(n_units, n_blocks // BLOCKS_PER_DAY, BLOCKS_PER_DAY)
+
+    present = ~np.isnan(by_day)
+
+    # leading zero day so day d sums days [d - baseline_days, d)
+    sums = np.zeros((n_units, by_day.shape[1] + 1, BLOCKS_PER_DAY))
+    counts = np.zeros_like(sums)
+
+    np.cumsum(np.where(present, by_day, 0.0), axis=1, out=sums[:, 1:])
+    np.cumsum(present, axis=1, out=counts[:, 1:])
+
+    upper = np.arange(by_day.shape[1])
+    lower = np.maximum(upper - baseline_days, 0)
+
+    window_sum = sums[:, upper] - sums[:, lower]
+    window_count = counts[:, upper] - counts[:, lower]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        baseline = window_sum / window_count
+
+    baseline[window_count < min(MIN_BASELINE_DAYS, baseline_days)] = np.nan
+
+    return baseline.reshape(n_units, n_blocks)
+
+
+# ============================
+# DROP EVENTS
+# ============================
+
+def flag_drops(grid, baseline, capacity, threshold=DROP_THRESHOLD):
+
+    # capacity is MW per unit row; NaN capacity never flags
+    block_capacity = (capacity * BLOCK_HOURS)[:, None]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+
+        baseline_utilisation = baseline / block_capacity
+        drop_utilisation = (baseline - grid) / block_capacity
+
+        flagged = (
+            (grid < baseline * (1 - threshold))
+            & (baseline_utilisation >= MIN_BASELINE_UTILISATION)
+            & (drop_utilisation >= MIN_DROP_UTILISATION)
+        )
+
+    return flagged
+
+
+def event_runs(flagged):
+
+    # consecutive flagged blocks of one unit form an event; a False
+    # column on both sides keeps runs from crossing unit rows
+    padded = np.zeros((flagged.shape[0], flagged.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = flagged
+
+    edges = np.diff(padded, axis=1)
+
+    start_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+
+    # np.nonzero walks row-major, so starts and ends pair up in order
+    return start_rows, starts, ends
+
+
+def unit_events(units, grid, details, grid_start, threshold, baseline_days):
+
+    # the drop events in one grid of units
+    capacity = np.array(
+        [
+            float(details[unit_id].unit_capacity_mw)
+            if details[unit_id].unit_capacity_mw is not None else np.nan
+            for unit_id in units
+        ]
+    )
+
+    baseline = rolling_baseline(grid, baseline_days)
+
+    flagged = flag_drops(grid, baseline, capacity, threshold)
+
+    # the look-back days only feed the baseline
+    flagged[:, :baseline_days * BLOCKS_PER_DAY] = False
+
+    rows, starts, ends = event_runs(flagged)
+
+    # per-event totals from running sums over each unit row
+    actual = np.where(flagged, grid, 0.0).cumsum(axis=1)
+    expected = np.where(flagged, baseline, 0.0).cumsum(axis=1)
+
+    def _span(totals):
+        before = np.where(starts > 0, totals[rows, np.maximum(starts - 1, 0)], 0.0)
+        return totals[rows, ends - 1] - before
+
+    actual_mwh = _span(actual)
+    expected_mwh = _span(expected)
+
+    block = timedelta(minutes=BLOCK_MINUTES)
+
+    events = []
+
+    for row, first, stop, got, wanted in zip(rows, starts, ends, actual_mwh, expected_mwh):
+
+        unit = details[int(units[row])]
+
+        events.append({
+            "unit_id": unit.unit_id,
+            "unit_code": unit.unit_code,
+            "plant_id": unit.plant_id,
+            "plant_name": unit.plant_name,
+            "state": unit.state,
+            "start_ts": grid_start + block * int(first),
+            "end_ts": grid_start + block * int(stop),
+            "blocks": int(stop - first),
+            "expected_mwh": round(float(wanted), 3),
+            "actual_mwh": round(float(got), 3),
+            "lost_mwh": round(float(wanted - got), 3),
+            "capacity_mw": None if np.isnan(capacity[row]) else float(capacity[row])
+        })
+
+    return events
+
+
+def detect_drops(
+    db: Session,
+    start,
+    end,
+    plant_id=None,
+    state=None,
+    threshold=DROP_THRESHOLD,
+    baseline_days=BASELINE_DAYS
+):
+
+    # start and end are dates, end inclusive; the load reaches back
+    # baseline_days so the first analysed day has a full baseline
+    grid_start = datetime.combine(start, datetime.min.time()) - timedelta(days=baseline_days)
+    grid_end = datetime.combine(end, datetime.min.time()) + timedelta(days=1)
+
+    days = (grid_end - grid_start).days
+
+    details = load_units(db, plant_id, state)
+
+    candidates = list(details)
+
+    units_analyzed = 0
+    readings = 0
+
+    events = []
+
+    # DROP_ANALYSIS_UNIT_BATCH units at a time, so the grids a request
+    # holds stay the same size however many units match
+    for first in range(0, len(candidates), DROP_ANALYSIS_UNIT_BATCH):
+
+        batch = candidates[first:first + DROP_ANALYSIS_UNIT_BATCH]
+
+        unit_ids, stamps, mwh = load_readings(db, grid_start, grid_end, batch)
+
+        if len(unit_ids) == 0:
+            continue
+
+        units, grid = build_grid(unit_ids, stamps, mwh, grid_start, days)
+
+        events += unit_events(units, grid, details, grid_start, threshold, baseline_days)
+
+        units_analyzed += len(units)
+        readings += len(unit_ids)
+
+    events.sort(key=lambda event: event["lost_mwh"], reverse=True)
+
+    return {
+        "units_analyzed": units_analyzed,
+        "readings": readings,
+        "events": events
+    }
@@ -0,0 +1,211 @@
+import csv
+import enum
+import io
+
+from sqlalchemy import Date, DateTime, DECIMAL, Integer, select
+
+from app.core.config import EXPORT_BATCH_ROWS
+from app.core.database import SessionLocal
+from app.models.master_model import Plant, PlantType, Unit
+from app.utils.fast_json import dumps
+
+
+EXPORT_TABLES = {
+    "plants": Plant,
+    "units": Unit,
+    "plant-types": PlantType
+}
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+
+# ============================
+# ROW BATCHES
+# ============================
+
+def _batches(model):
+
+    # server-side cursor: yield_per streams the result, so only one
+    # batch of rows is held at a time. The generator owns its session
+    # because it keeps running after the request handler has returned
+    db = SessionLocal()
+
+    try:
+
+        primary_key = model.__table__.primary_key.columns
+
+        result = db.execute(
+            select(*model.__table__.columns)
+            .order_by(*primary_key)
+            .execution_options(yield_per=EXPORT_BATCH_ROWS)
+        )
+
+        for batch in result.partitions():
+            yield batch
+
+    finally:
+
+        db.close()
+
+
+def _plain(value):
+
+    if isinstance(value, enum.Enum):
+        return value.value
+
+    return value
+
+
+# ============================
+# FORMATS
+# ============================
+
+def _ndjson(model):
+
+    # same encoder as the listing endpoints, so DECIMALs come out as
+    # strings in both
+    for batch in _batches(model):
+
+        yield b"".join(dumps(dict(row._mapping)) + b"\n" for row in batch)
+
+
+def _csv(model):
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # the header goes out before the first query returns
+    writer.writerow(model.__table__.columns.keys())
+
+    yield buffer.getvalue()
+
+    for batch in _batches(model):
+
+        buffer.seek(0)
+        buffer.truncate()
+
+        writer.writerows([_plain(value) for value in row] for row in batch)
+
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+
+    # write-only file for ParquetWriter; whatever was written since the
+    # last take() is handed to the response
+
+    def __init__(self):
+
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+
+        return True
+
+    def write(self, data):
+
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+
+        return len(data)
+
+    def tell(self):
+
+        return self._position
+
+    def take(self):
+
+        data = b"".join(self._chunks)
+        self._chunks = []
+
+        return data
+
+
+def _arrow_schema(model, pa):
+
+    fields = []
+
+    for column in model.__table__.columns:
+
+        if isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, DECIMAL):
+            arrow_type = pa.decimal128(column.type.precision, column.type.scale)
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        elif isinstance(column.type, Date):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+
+        fields.append(pa.field(column.key, arrow_type))
+
+    return pa.schema(fields)
+
+
+def _parquet(model):
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(model, pa)
+
+    sink = _ChunkSink()
+
+    # one row group per fetched batch, flushed to the client as it is
+    # written
+    with pq.ParquetWriter(sink, schema) as writer:
+
+        for batch in _batches(model):
+
+            columns = list(zip(*batch)) if batch else [[] for _ in schema]
+
+            writer.write_table(
+                pa.table(
+                    [
+                        pa.array([_plain(value) for value in values], type=field.type)
+                        for values, field in zip(columns, schema)
+                    ],
+                    schema=schema
+                )
+            )
+
+            yield sink.take()
+
+    yield sink.take()
+
+
+# ============================
+# EXPORT
+# ============================
+
+def parquet_available():
+
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def export_stream(table, fmt):
+
+    model = EXPORT_TABLES[table]
+
+    if fmt == "csv":
+        return _csv(model)
+
+    if fmt == "parquet":
+        return _parquet(model)
+
+    return _ndjson(model)
+
+
+def export_filename(table, fmt):
+
+    return f"{EXPORT_TABLES[table].__tablename__}.{fmt}"
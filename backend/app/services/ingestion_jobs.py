@@ -0,0 +1,402 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import hashlib
+import logging
+import os
+import threading
+import uuid
+
+from fastapi import UploadFile
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import UPLOAD_SPOOL_DIR, INGESTION_WORKERS, INGESTION_STALE_MINUTES
+from app.core.database import SessionLocal
+from app.core.query_stats import track_queries
+from app.models.master_model import FileIngestionLog, FileIngestionStage, UploadStatus
+from app.services.mas_upload_services import (
+    start_ingestion_log,
+    find_ingested_file,
+    upload_plants,
+    upload_units,
+    upload_workbook,
+    confirm_upload
+)
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# WORKER POOL
+# =========================
+
+_executor = ThreadPoolExecutor(
+    max_workers=INGESTION_WORKERS,
+    thread_name_prefix="ingestion"
+)
+
+
+# file_id -> future of every job not yet finished, so shutdown can tell
+# queued jobs from running ones
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _submit(file_id, *args):
+
+    future = _executor.submit(_run_job, file_id, *args)
+
+    with _jobs_lock:
+        _jobs[file_id] = future
+
+    def forget(_):
+        with _jobs_lock:
+            _jobs.pop(file_id, None)
+
+    future.add_done_callback(forget)
+
+
+def _remove_spool(path):
+
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def release_spool(db: Session, file_id, path):
+
+    # the spooled copy only lives as long as its job; once it is gone the
+    # log stops pointing at it. The rollback clears whatever a failed
+    # load left, its log is already committed
+    _remove_spool(path)
+
+    db.rollback()
+
+    db.execute(
+        update(FileIngestionLog)
+        .where(FileIngestionLog.file_id == file_id)
+        .values(storage_path=None)
+    )
+
+    db.commit()
+
+
+def fail_jobs(db: Session, logs, message):
+
+    # marks unfinished logs FAILED and drops their spooled files
+    for log in logs:
+
+        log.status = UploadStatus.FAILED
+        log.finished_at = datetime.now()
+        log.error_log = message
+
+        _remove_spool(log.storage_path)
+
+        log.storage_path = None
+
+    db.commit()
+
+    return len(logs)
+
+
+def shutdown_ingestion_workers():
+
+    # queued jobs are cancelled and failed; running ones are let finish
+    # so their transaction and log end cleanly
+    # cancel() runs the done callbacks, which take the lock themselves
+    with _jobs_lock:
+        jobs = list(_jobs.items())
+
+    cancelled = [file_id for file_id, future in jobs if future.cancel()]
+
+    if cancelled:
+
+        db = SessionLocal()
+
+        try:
+            logs = db.query(FileIngestionLog)\
+                .filter(FileIngestionLog.file_id.in_(cancelled))\
+                .filter(FileIngestionLog.status == UploadStatus.PROCESSING)\
+                .all()
+
+            fail_jobs(db, logs, "Cancelled: the server shut down before the job started, upload the file again")
+
+        finally:
+            db.close()
+
+    _executor.shutdown(wait=True)
+
+
+def recover_interrupted_jobs():
+
+    # at startup, logs still PROCESSING belong to jobs a previous process
+    # never finished (killed, crashed); with several app processes on one
+    # database set INGESTION_STALE_MINUTES so only old ones are touched
+    cutoff = datetime.now()
+
+    if INGESTION_STALE_MINUTES:
+        cutoff -= timedelta(minutes=INGESTION_STALE_MINUTES)
+
+    db = SessionLocal()
+
+    try:
+        logs = db.query(FileIngestionLog)\
+            .filter(FileIngestionLog.status == UploadStatus.PROCESSING)\
+            .filter(FileIngestionLog.uploaded_at < cutoff)\
+            .all()
+
+        failed = fail_jobs(db, logs, "Interrupted: the server stopped before the job finished, upload the file again")
+
+    finally:
+        db.close()
+
+    if failed:
+        logger.warning("marked %d interrupted ingestion job(s) FAILED", failed)
+
+    return failed
+
+
+# =========================
+# SPOOL TO DISK
+# =========================
+
+SPOOL_COPY_BUFFER = 1024 * 1024
+
+
+def spool_upload(upload_file):
+
+    # copies the upload to disk and hashes it in the same pass
+    UPLOAD_SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+
+    _, extension = os.path.splitext(upload_file.filename)
+
+    path = UPLOAD_SPOOL_DIR / f"{uuid.uuid4().hex}{extension.lower()}"
+
+    digest = hashlib.sha256()
+    size = 0
+
+    with open(path, "wb") as out:
+
+        for block in iter(lambda: upload_file.file.read(SPOOL_COPY_BUFFER), b""):
+            digest.update(block)
+            out.write(block)
+            size += len(block)
+
+    return path, digest.hexdigest(), size
+
+
+# =========================
+# JOB RUNNER
+# =========================
+
+def _ingest(upload, kind, data_type, db, log, on_progress, chunks=None):
+
+    if chunks is not None:
+        return confirm_upload(None, data_type, db, log=log, on_progress=on_progress, chunks=chunks)
+
+    if kind == "plant":
+        return upload_plants(upload, db, log=log, on_progress=on_progress)
+
+    if kind == "unit":
+        return upload_units(upload, db, log=log, on_progress=on_progress)
+
+    if kind == "workbook":
+        return upload_workbook(upload, db, log=log, on_progress=on_progress)
+
+    # "confirm" carries its category in data_type; spec-only categories
+    # such as "generation" are their own kind
+    return confirm_upload(upload, data_type or kind, db, log=log, on_progress=on_progress)
+
+
+def _progress_reporter(file_id):
+
+    # progress goes through its own short session so pollers can see it
+    # while the data transaction is still open
+    def report(rows_processed):
+
+        db = SessionLocal()
+
+        try:
+            db.query(FileIngestionLog)\
+                .filter(FileIngestionLog.file_id == file_id)\
+                .update({"rows_processed": rows_processed})
+            db.commit()
+
+        except Exception:
+            db.rollback()
+            logger.warning("could not record progress for file %s", file_id, exc_info=True)
+
+        finally:
+            db.close()
+
+    return report
+
+
+def _run_job(file_id, kind, data_type, chunks=None):
+
+    # jobs run outside any request, so they are tracked on their own
+    with track_queries(f"ingestion job {file_id}"):
+        _run_tracked_job(file_id, kind, data_type, chunks)
+
+
+def _run_tracked_job(file_id, kind, data_type, chunks=None):
+
+    db = SessionLocal()
+
+    log = db.get(FileIngestionLog, file_id)
+    path = log.storage_path
+
+    try:
+
+        # SQLite allows a single writer, so there progress only shows
+        # up once the job has finished
+        if db.get_bind().dialect.name == "sqlite":
+            on_progress = None
+        else:
+            on_progress = _progress_reporter(file_id)
+
+        if chunks is not None:
+
+            _ingest(None, kind, data_type, db, log, on_progress, chunks=chunks)
+
+        else:
+
+            with open(path, "rb") as spooled:
+
+                upload = UploadFile(file=spooled, filename=log.filename)
+
+                _ingest(upload, kind, data_type, db, log, on_progress)
+
+    except Exception:
+        # the upload service has already marked the log FAILED
+        logger.exception("ingestion job %s failed", file_id)
+
+    finally:
+
+        try:
+            if path:
+                release_spool(db, file_id, path)
+
+        finally:
+            db.close()
+
+
+def _already_ingested(previous):
+
+    # identical content already went in: hand back that result without
+    # parsing the file or touching the master tables
+    return {
+        "file_id": previous.file_id,
+        "filename": previous.filename,
+        "status": previous.status.value,
+        "rows_inserted": previous.rows_inserted,
+        "message": "Identical file already ingested"
+    }
+
+
+def submit_ingestion(upload_file, kind, db: Session, data_type=None):
+
+    # kind is "plant" / "unit" / "generation" for the direct uploads,
+    # "workbook" for a combined plant + unit workbook, or "confirm" for
+    # the preview-then-confirm flow, which also takes a data_type
+    category = data_type or kind
+
+    path, content_hash, size = spool_upload(upload_file)
+
+    previous = find_ingested_file(db, content_hash, category)
+
+    if previous is not None:
+        os.remove(path)
+        return _already_ingested(previous)
+
+    log = start_ingestion_log(
+        db,
+        upload_file.filename,
+        category,
+        storage_path=str(path),
+        file_size_kb=size // 1024,
+        content_hash=content_hash
+    )
+
+    _submit(log.file_id, kind, data_type)
+
+    return {
+        "file_id": log.file_id,
+        "filename": log.filename,
+        "status": log.status.value,
+        "message": "Upload accepted for processing"
+    }
+
+
+def submit_cached_ingestion(parsed, data_type, db: Session):
+
+    # a confirm backed by a preview token: the normalized chunks are
+    # already in memory so nothing is spooled or parsed again
+    # the preview token is the sha256 of the previewed file
+    previous = find_ingested_file(db, parsed["content_hash"], data_type)
+
+    if previous is not None:
+        return _already_ingested(previous)
+
+    log = start_ingestion_log(
+        db,
+        parsed["filename"],
+        data_type,
+        file_size_kb=parsed["size"] // 1024,
+        content_hash=parsed["content_hash"]
+    )
+
+    _submit(log.file_id, "confirm", data_type, parsed["chunks"])
+
+    return {
+        "file_id": log.file_id,
+        "filename": log.filename,
+        "status": log.status.value,
+        "message": "Upload accepted for processing"
+    }
+
+
+# =========================
+# JOB STATUS
+# =========================
+
+def get_job_status(db: Session, file_id: int):
+
+    log = db.get(FileIngestionLog, file_id)
+
+    if log is None:
+        return None
+
+    rows_per_second = None
+
+    if log.started_at is not None:
+
+        end = log.finished_at or datetime.now()
+        elapsed = (end - log.started_at).total_seconds()
+
+        if elapsed > 0:
+            rows_per_second = round((log.rows_processed or 0) / elapsed, 2)
+
+    stages = db.query(FileIngestionStage)\
+        .filter(FileIngestionStage.file_id == file_id)\
+        .order_by(FileIngestionStage.stage_id)\
+        .all()
+
+    return {
+        "file_id": log.file_id,
+        "filename": log.filename,
+        "data_category": log.data_category,
+        "status": log.status.value if log.status else None,
+        "rows_processed": log.rows_processed or 0,
+        "rows_inserted": log.rows_inserted or 0,
+        "rows_per_second": rows_per_second,
+        "file_size_kb": log.file_size_kb,
+        "content_hash": log.content_hash,
+        "uploaded_at": log.uploaded_at,
+        "started_at": log.started_at,
+        "finished_at": log.finished_at,
+        "error_log": log.error_log,
+        "stages": stages
+    }
@@ -0,0 +1,183 @@
+import threading
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.master_model import FileIngestionStage
+
+
+# ============================
+# HISTOGRAMS
+# ============================
+
+class Histogram:
+
+    # Prometheus-style cumulative histogram keyed by label values;
+    # in-process, so each worker exposes its own
+
+    def __init__(self, name, help_text, labels, buckets):
+
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+
+        self._series = {}
+        self._lock = threading.Lock()
+
+
+    def observe(self, value, **labels):
+
+        key = tuple(str(labels[name]) for name in self.labels)
+
+        with self._lock:
+
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+
+            series[1] += value
+            series[2] += 1
+
+
+    def render(self):
+
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram"
+        ]
+
+        with self._lock:
+
+            for key, (counts, total, count) in sorted(self._series.items()):
+
+                labels = ",".join(f'{name}="{label}"' for name, label in zip(self.labels, key))
+
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {bucket_count}')
+
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f"{self.name}_sum{{{labels}}} {total}")
+                lines.append(f"{self.name}_count{{{labels}}} {count}")
+
+        return "\n".join(lines)
+
+
+class Counter:
+
+    def __init__(self, name, help_text, labels):
+
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+
+        self._values = {}
+        self._lock = threading.Lock()
+
+
+    def inc(self, amount=1, **labels):
+
+        key = tuple(str(labels[name]) for name in self.labels)
+
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+    def render(self):
+
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter"
+        ]
+
+        with self._lock:
+
+            for key, value in sorted(self._values.items()):
+                labels = ",".join(f'{name}="{label}"' for name, label in zip(self.labels, key))
+                lines.append(f"{self.name}{{{labels}}} {value}")
+
+        return "\n".join(lines)
+
+
+STAGE_SECONDS = Histogram(
+    "ingestion_stage_seconds",
+    "Wall time per ingestion stage, summed over a file's chunks",
+    ["category", "stage"],
+    [0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900]
+)
+
+STAGE_ROWS = Histogram(
+    "ingestion_stage_rows",
+    "Rows handled per ingestion stage for one file",
+    ["category", "stage"],
+    [100, 1000, 10000, 100000, 1000000, 10000000]
+)
+
+FILE_SECONDS = Histogram(
+    "ingestion_file_seconds",
+    "Wall time of one file ingestion",
+    ["category"],
+    [0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600]
+)
+
+PEAK_RSS_BYTES = Histogram(
+    "ingestion_peak_rss_bytes",
+    "Highest process RSS seen at a stage boundary during one file ingestion",
+    ["category"],
+    [2 ** power for power in range(26, 34)]
+)
+
+FILES_TOTAL = Counter(
+    "ingestion_files_total",
+    "Finished file ingestions",
+    ["category", "status"]
+)
+
+METRICS = [STAGE_SECONDS, STAGE_ROWS, FILE_SECONDS, PEAK_RSS_BYTES, FILES_TOTAL]
+
+
+def render_metrics():
+
+    return "\n".join(metric.render() for metric in METRICS) + "\n"
+
+
+# ============================
+# RECORD
+# ============================
+
+def record_stages(db: Session, log, timer):
+
+    # stores the timer's stages as FileIngestionStage rows, in one
+    # executemany committed with the caller's log update, and feeds the
+    # histograms
+    category = log.data_category or "unknown"
+
+    rows = []
+
+    for name, entry in timer.stages.items():
+
+        rows.append({
+            "file_id": log.file_id,
+            "stage": name,
+            "seconds": round(entry["seconds"], 6),
+            "rows": entry["rows"],
+            "calls": entry["calls"],
+            "peak_rss_mb": entry["peak_rss"] // (1024 * 1024) if entry["peak_rss"] else None
+        })
+
+        STAGE_SECONDS.observe(entry["seconds"], category=category, stage=name)
+        STAGE_ROWS.observe(entry["rows"], category=category, stage=name)
+
+    if rows:
+        db.execute(insert(FileIngestionStage), rows)
+
+    FILE_SECONDS.observe(timer.elapsed(), category=category)
+
+    peak = timer.peak_rss()
+
+    if peak:
+        PEAK_RSS_BYTES.observe(peak, category=category)
+
+    FILES_TOTAL.inc(category=category, status=log.status.value)
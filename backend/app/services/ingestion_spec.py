@@ -0,0 +1,215 @@
+from app.models.master_model import Plant, Unit, PlantStatus, UnitStatus
+from app.models.generation_model import GenerationReading
+from app.services.rollup_service import track_readings, refresh_for_readings
+
+
+# ============================
+# FIELD / CATEGORY SPEC
+# ============================
+
+class FieldSpec:
+
+    # dtype is one of "string", "integer", "decimal", "date", "datetime",
+    # "enum"; fallback names another field whose value fills blanks
+
+    def __init__(
+        self,
+        name,
+        dtype,
+        aliases=(),
+        required=False,
+        default=None,
+        fallback=None,
+        choices=None
+    ):
+
+        self.name = name
+        self.dtype = dtype
+        self.aliases = tuple(aliases)
+        self.required = required
+        self.default = default
+        self.fallback = fallback
+        self.choices = list(choices) if choices else None
+        self.max_length = None
+        self.precision = None
+        self.scale = None
+
+
+class ReferenceSpec:
+
+    # fills target from another table when the file names the referenced
+    # row by a natural key instead, e.g. plant_code -> plant_id
+
+    def __init__(self, target, source, key_column, value_column):
+
+        self.target = target
+        self.source = source
+        self.key_column = key_column
+        self.value_column = value_column
+
+
+class CategorySpec:
+
+    # one data category (plant, unit, ...) compiled once at import into
+    # the lookups every upload path shares; track_loaded(typed, state)
+    # notes what each inserted chunk touched, and on_load(db, state) runs
+    # once with it before the upload commits
+
+    def __init__(
+        self,
+        name,
+        model,
+        fields,
+        dedup_key,
+        sheet_names=(),
+        references=(),
+        track_loaded=None,
+        on_load=None
+    ):
+
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.dedup_key = tuple(dedup_key)
+        self.sheet_names = tuple(name.lower() for name in sheet_names)
+        self.references = list(references)
+        self.track_loaded = track_loaded
+        self.on_load = on_load
+
+        table_columns = model.__table__.c
+
+        # header alias (lower case) -> standard column name
+        self.alias_lookup = {}
+
+        for field in fields:
+
+            for alias in (field.name,) + field.aliases:
+                self.alias_lookup[alias.strip().lower()] = field.name
+
+            if field.name in table_columns:
+
+                column_type = table_columns[field.name].type
+
+                field.max_length = getattr(column_type, "length", None)
+                field.precision = getattr(column_type, "precision", None)
+                field.scale = getattr(column_type, "scale", None)
+
+        self.required = [field.name for field in fields if field.required]
+        # filled into blanks by coerce_chunk
+        self.defaults = {
+            field.name: field.default
+            for field in fields
+            if field.default is not None
+        }
+        self.insert_columns = [
+            field.name for field in fields if field.name in table_columns
+        ]
+
+
+# ============================
+# CATEGORIES
+# ============================
+
+PLANT_SPEC = CategorySpec(
+    "plant",
+    Plant,
+    fields=[
+        FieldSpec("plant_code", "string", aliases=["code"], fallback="plant_name"),
+        FieldSpec("plant_name", "string", aliases=["name", "plant"], required=True),
+        FieldSpec("type_id", "integer", aliases=["type"], required=True),
+        FieldSpec("location", "string"),
+        FieldSpec("state", "string", required=True),
+        FieldSpec("district", "string", required=True),
+        FieldSpec(
+            "status",
+            "enum",
+            default="ACTIVE",
+            choices=[status.value for status in PlantStatus]
+        ),
+        FieldSpec("installed_capacity_mw", "decimal", aliases=["capacity"]),
+        FieldSpec("implementing_agency", "string", aliases=["agency"]),
+        FieldSpec("sector", "string"),
+        FieldSpec("commissioning_date", "date"),
+        FieldSpec("retirement_date", "date")
+    ],
+    dedup_key=["plant_code"],
+    sheet_names=["plant", "plants", "plant_master"]
+)
+
+UNIT_SPEC = CategorySpec(
+    "unit",
+    Unit,
+    fields=[
+        FieldSpec("plant_id", "integer", required=True),
+        FieldSpec("unit_code", "string", required=True),
+        FieldSpec("unit_capacity_mw", "decimal", aliases=["capacity"]),
+        FieldSpec("commissioning_date", "date"),
+        FieldSpec(
+            "status",
+            "enum",
+            default="ACTIVE",
+            choices=[status.value for status in UnitStatus]
+        )
+    ],
+    dedup_key=["plant_id", "unit_code"],
+    sheet_names=["unit", "units", "unit_master"],
+    references=[
+        ReferenceSpec("plant_id", "plant_code", Plant.plant_code, Plant.plant_id)
+    ]
+)
+
+
+# interval readings; units are named by id since unit codes are only
+# unique within a plant
+GENERATION_SPEC = CategorySpec(
+    "generation",
+    GenerationReading,
+    fields=[
+        FieldSpec("unit_id", "integer", aliases=["unit"], required=True),
+        FieldSpec(
+            "reading_ts",
+            "datetime",
+            aliases=["timestamp", "datetime", "reading_time", "block_start"],
+            required=True
+        ),
+        FieldSpec(
+            "generation_mwh",
+            "decimal",
+            aliases=["generation", "mwh", "energy_mwh"],
+            required=True
+        )
+    ],
+    dedup_key=["unit_id", "reading_ts"],
+    sheet_names=["generation", "readings"],
+    track_loaded=track_readings,
+    on_load=refresh_for_readings
+)
+
+
+# insertion order matters: a workbook loads its sheets in this order so
+# that units find the plants they reference
+SPECS = {
+    spec.name: spec
+    for spec in (PLANT_SPEC, UNIT_SPEC, GENERATION_SPEC)
+}
+
+
+def get_spec(category):
+
+    spec = SPECS.get(category)
+
+    if spec is None:
+        raise ValueError(f"Unknown data category: {category}")
+
+    return spec
+
+
+def spec_for_sheet(sheet_name):
+
+    name = sheet_name.strip().lower()
+
+    for spec in SPECS.values():
+        if name in spec.sheet_names:
+            return spec
+
+    return None
@@ -1,57 +1,39 @@
+from sqlalchemy import or_, tuple_
 from sqlalchemy.orm import Session
-from app.models.master_model import Plant, Unit, FileIngestionLog, UploadStatus
-from app.utils.file_parser import read_file
+from app.models.master_model import FileIngestionLog, UploadStatus
+from app.services.bulk_insert_service import bulk_insert, clean_row, clean_value
+from app.services.ingestion_spec import PLANT_SPEC, UNIT_SPEC, SPECS, get_spec, spec_for_sheet
+from app.services.validation_service import coerce_chunk
+from app.core.config import (
+    PREVIEW_CACHE_MAX_ENTRIES,
+    PREVIEW_CACHE_MAX_MB,
+    PREVIEW_CACHE_TTL_SECONDS
+)
+from app.utils.file_parser import (
+    read_file,
+    iter_file_chunks,
+    iter_workbook_sheets,
+    file_digest
+)
+from app.utils.ttl_cache import TTLCache
+from app.services.master_cache import MASTER_MODELS, invalidate_master_cache
+from app.services.ingestion_metrics import record_stages
+from app.utils.stage_timer import StageTimer
+from datetime import datetime
 import traceback
 import pandas as pd
 
 
-# ============================
-# COLUMN NORMALIZATION
-# ============================
-
-COLUMN_MAPPING_PLANT = {
-    "plant_name": ["plant_name", "name", "plant"],
-    "plant_code": ["plant_code", "code"],
-    "type_id": ["type_id", "type"],
-    "state": ["state"],
-    "district": ["district"],
-    "status": ["status"],
-    "installed_capacity_mw": ["installed_capacity_mw", "capacity"],
-    "implementing_agency": ["implementing_agency", "agency"],
-    "sector": ["sector"],
-    "commissioning_date": ["commissioning_date"],
-    "retirement_date": ["retirement_date"]
-}
-
-COLUMN_MAPPING_UNIT = {
-    "plant_id": ["plant_id"],
-    "unit_code": ["unit_code"],
-    "unit_capacity_mw": ["unit_capacity_mw", "capacity"],
-    "commissioning_date": ["commissioning_date"],
-    "status": ["status"]
-}
-
-
 # ============================
 # NORMALIZE COLUMN NAMES
 # ============================
 
-def normalize_columns(df, mapping):
+def normalize_columns(df, spec):
 
-    df.columns = df.columns.str.strip().str.lower()
+    # one rename through the spec's precompiled alias lookup
+    df.columns = df.columns.astype(str).str.strip().str.lower()
 
-    new_columns = {}
-
-    for standard, variations in mapping.items():
-
-        for col in df.columns:
-
-            if col in variations:
-                new_columns[col] = standard
-
-    df = df.rename(columns=new_columns)
-
-    return df
+    return df.rename(columns=spec.alias_lookup)
 
 
 # ============================
@@ -76,6 +58,73 @@ def validate_required(df, required_fields):
     return errors
 
 
+# ============================
+# INGESTION LOG
+# ============================
+
+def start_ingestion_log(db: Session, filename, category, **fields):
+
+    log = FileIngestionLog(
+        filename=filename,
+        data_category=category,
+        status=UploadStatus.PROCESSING,
+        uploaded_at=datetime.now(),
+        **fields
+    )
+
+    db.add(log)
+    db.commit()
+    db.refresh(log)
+
+    return log
+
+
+def find_ingested_file(db: Session, content_hash, category):
+
+    # an earlier successful ingestion of byte-identical content that
+    # loaded every row; a run with rejected rows (error_log holds their
+    # messages) does not count, since the same file may load them once
+    # the missing reference data is in
+    return db.query(FileIngestionLog)\
+        .filter(
+            FileIngestionLog.content_hash == content_hash,
+            FileIngestionLog.data_category == category,
+            FileIngestionLog.status == UploadStatus.SUCCESS,
+            or_(FileIngestionLog.error_log.is_(None), FileIngestionLog.error_log == "")
+        )\
+        .order_by(FileIngestionLog.file_id.desc())\
+        .first()
+
+
+def begin_ingestion(db: Session, log):
+
+    log.started_at = datetime.now()
+    log.rows_processed = 0
+
+    db.commit()
+
+
+# ============================
+# ROW BUILDERS
+# ============================
+
+def build_rows(typed, spec):
+
+    # typed comes out of coerce_chunk, so rows only need NaN -> None
+    return [
+        clean_row(row)
+        for row in typed[spec.insert_columns].to_dict(orient="records")
+    ]
+
+
+def _row_messages(row_errors, label="Row"):
+
+    return [
+        f"{label} {i+1}: {message}"
+        for i, message in row_errors.dropna().items()
+    ]
+
+
 # ============================
 # PREVIEW PLANTS
 # ============================
@@ -84,12 +133,9 @@ def preview_plants(upload_file):
 
     df = read_file(upload_file)
 
-    df = normalize_columns(df , COLUMN_MAPPING_PLANT)
+    df = normalize_columns(df, PLANT_SPEC)
 
-
-    required = ["plant_name", "type_id", "state", "district"]
-
-    errors = validate_required(df, required)
+    errors = validate_required(df, PLANT_SPEC.required)
 
     return {
         "preview": df.fillna("").to_dict(orient="records"),
@@ -101,91 +147,90 @@ def preview_plants(upload_file):
 # ============================
 # SAVE PLANTS
 # ============================
-# 
-def upload_plants(upload_file, db: Session):
-
-    log = FileIngestionLog(
-        filename=upload_file.filename,
-        data_category="plant",
-        status=UploadStatus.PROCESSING
-    )
-
-    db.add(log)
-    db.commit()
-    db.refresh(log)
-
-    try:
 
-        df = read_file(upload_file)
+def upload_plants(upload_file, db: Session, log=None, on_progress=None):
 
-        df = normalize_columns(df, COLUMN_MAPPING_PLANT)
+    if log is None:
+        log = start_ingestion_log(db, upload_file.filename, "plant")
 
-        required = ["plant_name", "type_id", "state", "district"]
+    begin_ingestion(db, log)
 
-        errors = validate_required(df, required)
+    timer = StageTimer()
 
-        if errors:
-
-            log.status = UploadStatus.FAILED
-            log.error_log = str(errors)
-            db.commit()
-
-            return {
-                "status": "error",
-                "errors": errors
-            }
+    try:
 
         rows = 0
+        processed = 0
+        batches = []
 
-        for _, row in df.iterrows():
+        for df in read_chunks(iter_file_chunks(upload_file), PLANT_SPEC, timer):
 
-            plant = Plant(
+            with timer.stage("validate", len(df)):
 
-                plant_code=row.get("plant_code") or row["plant_name"],
+                errors = validate_required(df, PLANT_SPEC.required)
 
-                plant_name=row["plant_name"],
+                typed, row_errors = coerce_chunk(df, PLANT_SPEC, check_required=False)
 
-                type_id=int(row["type_id"]),
+            errors += _row_messages(row_errors)
 
-                state=row["state"],
+            if errors:
 
-                district=row["district"],
+                # drop the chunks already sent, the file goes in whole or not at all
+                db.rollback()
 
-                status=row.get("status") or "ACTIVE",
+                log.status = UploadStatus.FAILED
+                log.finished_at = datetime.now()
+                log.error_log = str(errors)
+                record_stages(db, log, timer)
+                db.commit()
 
-                installed_capacity_mw=row.get("installed_capacity_mw"),
+                return {
+                    "status": "error",
+                    "errors": errors
+                }
 
-                implementing_agency=row.get("implementing_agency"),
+            with timer.stage("insert", len(typed)):
 
-                sector=row.get("sector"),
+                plant_rows = build_rows(typed, PLANT_SPEC)
 
-                commissioning_date=row.get("commissioning_date"),
+                batches += bulk_insert(db, PLANT_SPEC.model, plant_rows)
 
-                retirement_date=row.get("retirement_date")
+            rows += len(plant_rows)
+            processed += len(df)
 
-            )
+            if on_progress:
+                on_progress(processed)
 
-            db.add(plant)
-
-            rows += 1
+        with timer.stage("commit", rows):
+            db.commit()
 
-        db.commit()
+        invalidate_master_cache()
 
         log.status = UploadStatus.SUCCESS
+        log.finished_at = datetime.now()
         log.rows_inserted = rows
+        log.rows_processed = processed
+
+        record_stages(db, log, timer)
 
         db.commit()
 
         return {
             "status": "success",
-            "rows_inserted": rows
+            "rows_inserted": rows,
+            "batches": batches
         }
 
     except Exception as e:
 
+        db.rollback()
+
         log.status = UploadStatus.FAILED
+        log.finished_at = datetime.now()
         log.error_log = traceback.format_exc()
 
+        record_stages(db, log, timer)
+
         db.commit()
 
         raise e
@@ -199,11 +244,9 @@ def preview_units(upload_file):
 
     df = read_file(upload_file)
 
-    df = normalize_columns(df, COLUMN_MAPPING_UNIT)
+    df = normalize_columns(df, UNIT_SPEC)
 
-    required = ["plant_id"]
-
-    errors = validate_required(df, required)
+    errors = validate_required(df, UNIT_SPEC.required)
 
     return {
         "preview": df.fillna("").to_dict(orient="records"),
@@ -217,78 +260,92 @@ def preview_units(upload_file):
 # SAVE UNITS
 # ============================
 
-def upload_units(upload_file, db: Session):
+def upload_units(upload_file, db: Session, log=None, on_progress=None):
 
-    log = FileIngestionLog(
-        filename=upload_file.filename,
-        data_category="unit",
-        status=UploadStatus.PROCESSING
-    )
+    if log is None:
+        log = start_ingestion_log(db, upload_file.filename, "unit")
 
-    db.add(log)
-    db.commit()
-    db.refresh(log)
+    begin_ingestion(db, log)
+
+    timer = StageTimer()
 
     try:
 
-        df = read_file(upload_file)
+        rows = 0
+        processed = 0
+        batches = []
 
-        df = normalize_columns(df, COLUMN_MAPPING_UNIT)
+        for df in read_chunks(iter_file_chunks(upload_file), UNIT_SPEC, timer):
 
-        required = ["plant_id"]
+            with timer.stage("resolve", len(df)):
+                df = resolve_references(db, df, UNIT_SPEC)
 
-        errors = validate_required(df, required)
+            with timer.stage("validate", len(df)):
 
-        if errors:
+                errors = validate_required(df, UNIT_SPEC.required)
 
-            log.status = UploadStatus.FAILED
-            log.error_log = str(errors)
-            db.commit()
+                typed, row_errors = coerce_chunk(df, UNIT_SPEC, check_required=False)
 
-            return {
-                "status": "error",
-                "errors": errors
-            }
+            errors += _row_messages(row_errors)
 
-        rows = 0
+            if errors:
 
-        for _, row in df.iterrows():
+                # drop the chunks already sent, the file goes in whole or not at all
+                db.rollback()
 
-            unit = Unit(
+                log.status = UploadStatus.FAILED
+                log.finished_at = datetime.now()
+                log.error_log = str(errors)
+                record_stages(db, log, timer)
+                db.commit()
 
-                plant_id=int(row["plant_id"]),
+                return {
+                    "status": "error",
+                    "errors": errors
+                }
 
-                unit_code=row.get("unit_code"),
+            with timer.stage("insert", len(typed)):
 
-                unit_capacity_mw=row.get("unit_capacity_mw"),
+                unit_rows = build_rows(typed, UNIT_SPEC)
 
-                commissioning_date=row.get("commissioning_date"),
+                batches += bulk_insert(db, UNIT_SPEC.model, unit_rows)
 
-                status=row.get("status") or "ACTIVE"
+            rows += len(unit_rows)
+            processed += len(df)
 
-            )
-
-            db.add(unit)
+            if on_progress:
+                on_progress(processed)
 
-            rows += 1
+        with timer.stage("commit", rows):
+            db.commit()
 
-        db.commit()
+        invalidate_master_cache()
 
         log.status = UploadStatus.SUCCESS
+        log.finished_at = datetime.now()
         log.rows_inserted = rows
+        log.rows_processed = processed
+
+        record_stages(db, log, timer)
 
         db.commit()
 
         return {
             "status": "success",
-            "rows_inserted": rows
+            "rows_inserted": rows,
+            "batches": batches
         }
 
     except Exception as e:
 
+        db.rollback()
+
         log.status = UploadStatus.FAILED
+        log.finished_at = datetime.now()
         log.error_log = traceback.format_exc()
 
+        record_stages(db, log, timer)
+
         db.commit()
 
         raise e
@@ -297,209 +354,312 @@ def upload_units(upload_file, db: Session):
 
 
 # =========================
-# REQUIRED FIELDS
+# DUPLICATE CHECK
 # =========================
 
-PLANT_REQUIRED = ["plant_name", "type_id"]
-UNIT_REQUIRED = ["plant_id", "unit_code"]
+DUPLICATE_LOOKUP_CHUNK = 1000
+
+
+def _chunks(values, size):
+
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def duplicate_mask(db, typed, spec):
+
+    # the distinct dedup keys of the chunk are looked up with chunked IN
+    # queries (row-value IN for composite keys) and matched back with isin
+    keys = typed[list(spec.dedup_key)]
+    present = keys.notna().all(axis=1)
+
+    candidates = list(dict.fromkeys(
+        tuple(clean_value(value) for value in key)
+        for key in keys[present].itertuples(index=False, name=None)
+    ))
+
+    columns = [getattr(spec.model, name) for name in spec.dedup_key]
+
+    existing = set()
+
+    for chunk in _chunks(candidates, DUPLICATE_LOOKUP_CHUNK):
+
+        if len(columns) == 1:
+            condition = columns[0].in_([key[0] for key in chunk])
+        else:
+            condition = tuple_(*columns).in_(chunk)
+
+        rows = db.query(*columns).filter(condition).all()
+
+        existing.update(tuple(row) for row in rows)
+
+    mask = pd.Series(False, index=typed.index)
+
+    if existing:
+        mask[present] = pd.MultiIndex.from_frame(keys[present]).isin(existing)
+
+    return mask
 
 
 # =========================
-# DUPLICATE CHECK
+# REFERENCE LOOKUP
 # =========================
 
-def is_duplicate_plant(db, plant_code):
+def resolve_references(db, df, spec):
 
-    return db.query(Plant)\
-        .filter(Plant.plant_code == plant_code)\
-        .first() is not None
+    # rows that name the referenced record by natural key (a unit's
+    # plant_code) get its id filled in with chunked IN lookups; returns a
+    # new frame so cached preview chunks are never modified
+    for ref in spec.references:
 
+        if ref.source not in df.columns:
+            continue
 
-def is_duplicate_unit(db, plant_id, unit_code):
+        if ref.target in df.columns:
+            target = df[ref.target]
+        else:
+            target = pd.Series(None, index=df.index, dtype=object)
 
-    return db.query(Unit)\
-        .filter(
-            Unit.plant_id == plant_id,
-            Unit.unit_code == unit_code
-        ).first() is not None
+        source = df[ref.source]
+        needed = target.isna() & source.notna()
+
+        if not needed.any():
+            continue
+
+        keys = source[needed].astype(str).str.strip()
+
+        found = {}
+
+        for chunk in _chunks(keys.unique().tolist(), DUPLICATE_LOOKUP_CHUNK):
+
+            rows = db.query(ref.key_column, ref.value_column)\
+                .filter(ref.key_column.in_(chunk))\
+                .all()
+
+            found.update((key, value) for key, value in rows)
+
+        resolved = target.astype(object).copy()
+        resolved[needed] = keys.map(found)
+
+        df = df.assign(**{ref.target: resolved})
+
+    return df
+
+
+def dedup_keys(typed, spec):
+
+    return pd.Series(
+        list(typed[list(spec.dedup_key)].itertuples(index=False, name=None)),
+        index=typed.index,
+        dtype=object
+    )
+
+
+def drop_duplicates(db, typed, spec):
+
+    # drops rows already in the table or repeated within the chunk;
+    # earlier chunks of the same file are already inserted in this
+    # transaction, so the table lookup finds their keys too and no key
+    # set has to grow with the file
+    keys = dedup_keys(typed, spec)
+
+    duplicates = duplicate_mask(db, typed, spec) | keys.duplicated()
+
+    return typed[~duplicates], int(duplicates.sum())
 
 
 # =========================
 # PREVIEW
 # =========================
 
-def preview_upload(file, category, db: Session):
+PREVIEW_ROWS = 10
 
-    df = read_file(file)
 
-    total = len(df)
+def _parsed_size(parsed):
 
-    valid = 0
-    invalid = 0
-    duplicate = 0
+    return sum(int(df.memory_usage(deep=True).sum()) for df in parsed["chunks"])
 
-    preview = []
 
-    for index, row in df.iterrows():
+# normalized chunks of previewed files, keyed by (category, sha256) so
+# /confirm can reuse them through the preview token
+preview_cache = TTLCache(
+    max_entries=PREVIEW_CACHE_MAX_ENTRIES,
+    ttl_seconds=PREVIEW_CACHE_TTL_SECONDS,
+    max_size=PREVIEW_CACHE_MAX_MB * 1024 * 1024,
+    sizeof=_parsed_size
+)
 
-        row_dict = row.to_dict()
 
-        errors = []
+def get_cached_preview(token, category):
 
-        if category == "plant":
+    return preview_cache.get((category, token))
 
-            for field in PLANT_REQUIRED:
-                if pd.isna(row.get(field)):
-                    errors.append(f"{field} required")
 
-            plant_code = row.get("plant_code") or row.get("plant_name")
+def preview_upload(file, category, db: Session):
 
-            if plant_code and is_duplicate_plant(db, plant_code):
-                duplicate += 1
-                errors.append("Duplicate")
+    spec = get_spec(category)
 
-        else:
+    token, size = file_digest(file)
 
-            for field in UNIT_REQUIRED:
-                if pd.isna(row.get(field)):
-                    errors.append(f"{field} required")
+    parsed = get_cached_preview(token, category)
 
-            if is_duplicate_unit(
-                db,
-                row.get("plant_id"),
-                row.get("unit_code")
-            ):
-                duplicate += 1
-                errors.append("Duplicate")
+    if parsed is not None:
+        source = parsed["chunks"]
+        kept = None
+    else:
+        source = (normalize_columns(df, spec) for df in iter_file_chunks(file))
+        kept = []
 
+    kept_size = 0
 
-        if errors:
-            invalid += 1
-        else:
-            valid += 1
+    total = 0
 
-        row_dict["errors"] = errors
+    valid = 0
+    invalid = 0
+    duplicate = 0
 
-        preview.append(row_dict)
+    preview = []
 
+    for df in source:
 
-    return {
+        # keep the chunks for /confirm until they outgrow the cache
+        if kept is not None:
 
-        "filename": file.filename,
+            kept.append(df)
+            kept_size += int(df.memory_usage(deep=True).sum())
 
-        "total_rows": total,
+            if kept_size > preview_cache.max_size:
+                kept = None
 
-        "valid_rows": valid,
+        total += len(df)
 
-        "invalid_rows": invalid,
+        # same order as load_typed, so the counts match what /confirm
+        # will load
+        typed, row_errors = coerce_chunk(df, spec)
 
-        "duplicate_rows": duplicate,
+        typed, row_errors = resolve_typed(db, typed, row_errors, spec)
 
-        "preview_data": preview[:10],
+        duplicates = duplicate_mask(db, typed, spec)
 
-        "message": "Preview generated"
-    }
+        bad = row_errors.notna() | duplicates
 
+        duplicate += int(duplicates.sum())
+        invalid += int(bad.sum())
+        valid += int((~bad).sum())
 
-# =========================
-# FINAL UPLOAD
-# =========================
+        # only the rows that are actually shown get turned into dicts
+        for index in df.index[:PREVIEW_ROWS - len(preview)]:
 
-def upload_file(file, category, db: Session):
+            row_dict = clean_row(df.loc[index].to_dict())
 
-    log = FileIngestionLog(
+            # the ids the file named by key, as confirm will store them
+            for ref in spec.references:
+                row_dict[ref.target] = clean_value(typed.at[index, ref.target])
 
-        filename=file.filename,
+            errors = row_errors[index].split("; ") if row_errors[index] else []
 
-        data_category=category,
+            if duplicates[index]:
+                errors.append("Duplicate")
 
-        status=UploadStatus.PROCESSING
-    )
+            row_dict["errors"] = errors
 
-    db.add(log)
-    db.commit()
-    db.refresh(log)
+            preview.append(row_dict)
 
 
-    try:
+    if kept is not None:
 
-        df = read_file(file)
+        cached = preview_cache.set(
+            (category, token),
+            {
+                "filename": file.filename,
+                "content_hash": token,
+                "size": size,
+                "chunks": kept
+            }
+        )
 
-        inserted = 0
-        duplicate = 0
+        if not cached:
+            token = None
 
+    elif parsed is None:
+        token = None
 
-        for _, row in df.iterrows():
 
-            if category == "plant":
+    return {
 
-                plant_code = row.get("plant_code") or row.get("plant_name")
+        "filename": file.filename,
 
-                if is_duplicate_plant(db, plant_code):
-                    duplicate += 1
-                    continue
+        "total_rows": total,
 
+        "valid_rows": valid,
 
-                plant = Plant(
+        "invalid_rows": invalid,
 
-                    plant_code=plant_code,
+        "duplicate_rows": duplicate,
 
-                    plant_name=row.get("plant_name"),
+        "preview_data": preview,
 
-                    type_id=row.get("type_id"),
+        "preview_token": token,
 
-                    state=row.get("state"),
+        "message": "Preview generated"
+    }
 
-                    district=row.get("district"),
 
-                    status=row.get("status", "ACTIVE"),
+# =========================
+# FINAL UPLOAD
+# =========================
 
-                    installed_capacity_mw=row.get("installed_capacity_mw"),
+def upload_file(file, category, db: Session, log=None, on_progress=None):
 
-                    implementing_agency=row.get("implementing_agency"),
+    if log is None:
+        log = start_ingestion_log(db, file.filename, category)
 
-                    sector=row.get("sector"),
+    begin_ingestion(db, log)
 
-                    commissioning_date=row.get("commissioning_date")
-                )
 
-                db.add(plant)
-                inserted += 1
+    try:
 
+        spec = get_spec(category)
 
-            else:
+        inserted = 0
+        processed = 0
+        failed = 0
+        duplicate = 0
+        batches = []
 
-                if is_duplicate_unit(
-                    db,
-                    row.get("plant_id"),
-                    row.get("unit_code")
-                ):
-                    duplicate += 1
-                    continue
+        for df in iter_file_chunks(file):
 
+            df = normalize_columns(df, spec)
 
-                unit = Unit(
+            typed, row_errors = coerce_chunk(df, spec)
+            typed, row_errors = resolve_typed(db, typed, row_errors, spec)
 
-                    plant_id=row.get("plant_id"),
+            failed += int(row_errors.notna().sum())
 
-                    unit_code=row.get("unit_code"),
+            typed, dropped = drop_duplicates(db, typed[row_errors.isna()], spec)
 
-                    unit_capacity_mw=row.get("unit_capacity_mw"),
+            duplicate += dropped
 
-                    commissioning_date=row.get("commissioning_date"),
+            rows = build_rows(typed, spec)
 
-                    status=row.get("status", "ACTIVE")
-                )
+            batches += bulk_insert(db, spec.model, rows)
 
-                db.add(unit)
-                inserted += 1
+            inserted += len(rows)
+            processed += len(df)
 
+            if on_progress:
+                on_progress(processed)
 
         db.commit()
 
+        if inserted and spec.model in MASTER_MODELS:
+            invalidate_master_cache()
+
 
         log.status = UploadStatus.SUCCESS
+        log.finished_at = datetime.now()
         log.rows_inserted = inserted
+        log.rows_processed = processed
 
         db.commit()
 
@@ -512,13 +672,20 @@ def upload_file(file, category, db: Session):
 
             "duplicate_rows": duplicate,
 
+            "failed": failed,
+
+            "batches": batches,
+
             "message": "Upload successful"
         }
 
 
     except Exception as e:
 
+        db.rollback()
+
         log.status = UploadStatus.FAILED
+        log.finished_at = datetime.now()
 
         log.error_log = traceback.format_exc()
 
@@ -535,153 +702,257 @@ def upload_file(file, category, db: Session):
 # CONFIRM UPLOAD FUNCTION
 # =========================
 
-def confirm_upload(upload_file, data_type: str, db: Session):
+def new_totals():
 
-    # select correct mapping
-    if data_type == "plant":
-        mapping = COLUMN_MAPPING_PLANT
-        required = PLANT_REQUIRED
-    else:
-        mapping = COLUMN_MAPPING_UNIT
-        required = UNIT_REQUIRED
+    return {
+        "inserted": 0,
+        "processed": 0,
+        "failed": 0,
+        "duplicate": 0,
+        "errors": [],
+        "batches": [],
+        # models that got rows, to tell whether the master cache is stale
+        "models": set(),
+        # spec name -> what its inserted chunks touched, for spec.on_load
+        "loaded": {},
+        "timer": StageTimer()
+    }
 
-    df = read_file(upload_file)
 
-    # normalize columns
-    df = normalize_columns(df, mapping)
+def read_chunks(source, spec, timer):
 
-    inserted = 0
-    failed = 0
-    duplicate = 0
-    errors = []
+    # file chunks, normalized, with reading and normalizing timed apart
+    for df in timer.iterate(source, "read"):
 
-    # create ingestion log
-    log = FileIngestionLog(
-        filename=upload_file.filename,
-        data_category=data_type,
-        status=UploadStatus.PROCESSING
-    )
+        with timer.stage("normalize", len(df)):
+            df = normalize_columns(df, spec)
 
-    db.add(log)
-    db.commit()
-    db.refresh(log)
+        yield df
 
-    try:
 
-        for i, row in df.iterrows():
+def load_chunks(db: Session, spec, chunks, totals, on_progress=None, label="Row"):
 
-            try:
+    # each chunk is checked and inserted before the next one is read
+    for df in chunks:
 
-                # check required fields
-                missing = False
-                for field in required:
-                    if pd.isna(row.get(field)):
-                        missing = True
-                        break
+        # type coercion and checks run column-wise; only clean, typed
+        # rows go on to dedup and insert
+        with totals["timer"].stage("validate", len(df)):
+            typed, row_errors = coerce_chunk(df, spec)
 
-                if missing:
-                    failed += 1
-                    continue
+        load_typed(db, spec, typed, row_errors, totals, label)
 
+        if on_progress:
+            on_progress(totals["processed"])
 
-                # =====================
-                # PLANT INSERT
-                # =====================
 
-                if data_type == "plant":
+def resolve_typed(db, typed, row_errors, spec):
 
-                    plant_code = str(
-                        row.get("plant_code") or row.get("plant_name")
-                    ).strip()
+    # fills reference ids on coerced rows; a key with no matching record
+    # becomes a row error
+    typed = resolve_references(db, typed, spec)
 
-                    if is_duplicate_plant(db, plant_code):
-                        duplicate += 1
-                        continue
+    row_errors = row_errors.copy()
 
-                    plant = Plant(
-                        plant_code=plant_code,
-                        plant_name=row.get("plant_name"),
-                        type_id=int(row.get("type_id")),
-                        state=row.get("state"),
-                        district=row.get("district"),
-                        installed_capacity_mw=row.get("installed_capacity_mw"),
-                        implementing_agency=row.get("implementing_agency"),
-                        sector=row.get("sector"),
-                        commissioning_date=row.get("commissioning_date"),
-                        retirement_date=row.get("retirement_date"),
-                        status=row.get("status", "ACTIVE")
-                    )
+    for ref in spec.references:
 
-                    db.add(plant)
-                    inserted += 1
+        typed[ref.target] = typed[ref.target].astype("Int64")
 
+        unresolved = row_errors.isna() & typed[ref.target].isna() & typed[ref.source].notna()
 
-                # =====================
-                # UNIT INSERT
-                # =====================
+        row_errors[unresolved] = ref.source + " " + typed.loc[unresolved, ref.source] + " not found"
 
-                else:
+    return typed, row_errors
 
-                    plant_id = int(row.get("plant_id"))
-                    unit_code = row.get("unit_code")
 
-                    if is_duplicate_unit(db, plant_id, unit_code):
-                        duplicate += 1
-                        continue
+def load_typed(db: Session, spec, typed, row_errors, totals, label="Row"):
 
-                    unit = Unit(
-                        plant_id=plant_id,
-                        unit_code=unit_code,
-                        unit_capacity_mw=row.get("unit_capacity_mw"),
-                        commissioning_date=row.get("commissioning_date"),
-                        status=row.get("status", "ACTIVE")
-                    )
+    # write half of load_chunks, also fed by batch uploads whose chunks
+    # were coerced in worker processes
+    timer = totals["timer"]
 
-                    db.add(unit)
-                    inserted += 1
+    with timer.stage("resolve", len(typed)):
+        typed, row_errors = resolve_typed(db, typed, row_errors, spec)
 
+    totals["failed"] += int(row_errors.notna().sum())
+    totals["errors"] += _row_messages(row_errors, label)
 
-            except Exception as e:
+    with timer.stage("dedup", int(row_errors.isna().sum())):
+        typed, dropped = drop_duplicates(db, typed[row_errors.isna()], spec)
 
-                failed += 1
-                errors.append(f"Row {i+1}: {str(e)}")
+    totals["duplicate"] += dropped
 
+    with timer.stage("insert", len(typed)):
 
-        db.commit()
+        rows = build_rows(typed, spec)
 
-        # update log
-        log.status = UploadStatus.SUCCESS
-        log.rows_inserted = inserted
-        log.error_log = "\n".join(errors)
+        totals["batches"] += bulk_insert(db, spec.model, rows)
+
+    if rows:
+        totals["models"].add(spec.model)
+
+    if spec.on_load and rows:
+        spec.track_loaded(typed, totals["loaded"].setdefault(spec.name, {}))
+
+    totals["inserted"] += len(rows)
+    totals["processed"] += len(row_errors)
+
+
+def _finish_load(db: Session, log, totals):
+
+    # once per upload, however many chunks it took
+    for name, state in totals["loaded"].items():
+        with totals["timer"].stage("on_load", totals["inserted"]):
+            get_spec(name).on_load(db, state)
 
+    with totals["timer"].stage("commit", totals["inserted"]):
         db.commit()
 
-        # ✅ IMPORTANT: return ALL schema fields
-        return {
+    # generation loads leave the master listings as they were
+    if totals["models"].intersection(MASTER_MODELS):
+        invalidate_master_cache()
 
-            "success": True,
+    # update log
+    log.status = UploadStatus.SUCCESS
+    log.finished_at = datetime.now()
+    log.rows_inserted = totals["inserted"]
+    log.rows_processed = totals["processed"]
+    log.error_log = "\n".join(totals["errors"])
 
-            "message": "Upload completed",
+    record_stages(db, log, totals["timer"])
 
-            "inserted": inserted,
+    db.commit()
 
-            "failed": failed,
+    # ✅ IMPORTANT: return ALL schema fields
+    return {
 
-            "errors": errors,
+        "success": True,
 
-            "status": "SUCCESS",
+        "message": "Upload completed",
 
-            "rows_inserted": inserted,
+        "inserted": totals["inserted"],
 
-            "duplicate_rows": duplicate
-        }
+        "failed": totals["failed"],
+
+        "errors": totals["errors"],
+
+        "status": "SUCCESS",
+
+        "rows_inserted": totals["inserted"],
+
+        "duplicate_rows": totals["duplicate"],
+
+        "batches": totals["batches"]
+    }
+
+
+def _fail_load(db: Session, log, totals=None):
+
+    db.rollback()
+
+    log.status = UploadStatus.FAILED
+    log.finished_at = datetime.now()
+    log.error_log = traceback.format_exc()
+
+    # how far a failed load got, and how long it took
+    if totals is not None:
+        record_stages(db, log, totals["timer"])
+
+    db.commit()
+
+
+def confirm_upload(upload_file, data_type: str, db: Session, log=None, on_progress=None, chunks=None):
+
+    # chunks, when given, are already normalized frames from the preview
+    # cache and replace reading upload_file
+
+    # select the category spec
+    spec = get_spec(data_type)
+
+    totals = new_totals()
+
+    # create ingestion log
+    if log is None:
+        log = start_ingestion_log(db, upload_file.filename, data_type)
+
+    begin_ingestion(db, log)
+
+    try:
+
+        if chunks is None:
+            chunks = read_chunks(iter_file_chunks(upload_file), spec, totals["timer"])
+
+        load_chunks(db, spec, chunks, totals, on_progress)
+
+        return _finish_load(db, log, totals)
 
 
     except Exception as e:
 
-        log.status = UploadStatus.FAILED
-        log.error_log = traceback.format_exc()
+        _fail_load(db, log, totals)
 
-        db.commit()
+        raise e
+
+
+# =========================
+# WORKBOOK UPLOAD
+# =========================
+
+def _workbook_sheets(sheet_names):
+
+    # known sheets only, in SPECS order so plants go in before units
+    order = list(SPECS)
+
+    matched = []
+
+    for sheet_name in sheet_names:
+
+        spec = spec_for_sheet(sheet_name)
+
+        if spec is not None:
+            matched.append((order.index(spec.name), sheet_name))
+
+    return [sheet_name for _, sheet_name in sorted(matched)]
+
+
+def upload_workbook(upload_file, db: Session, log=None, on_progress=None):
+
+    # one workbook holding plant and unit sheets, read in a single pass
+    # and loaded in one transaction
+    if log is None:
+        log = start_ingestion_log(db, upload_file.filename, "workbook")
+
+    begin_ingestion(db, log)
+
+    totals = new_totals()
+    sheets = []
+
+    try:
+
+        for sheet_name, chunks in iter_workbook_sheets(upload_file, _workbook_sheets):
+
+            spec = spec_for_sheet(sheet_name)
+
+            chunks = read_chunks(chunks, spec, totals["timer"])
+
+            load_chunks(db, spec, chunks, totals, on_progress, label=f"{sheet_name} row")
+
+            sheets.append(sheet_name)
+
+        if not sheets:
+            raise ValueError(
+                "Workbook has no plant or unit sheet; expected one of "
+                + ", ".join(name for spec in SPECS.values() for name in spec.sheet_names)
+            )
+
+        result = _finish_load(db, log, totals)
+        result["message"] = f"Workbook loaded: {', '.join(sheets)}"
+
+        return result
+
+
+    except Exception as e:
+
+        _fail_load(db, log, totals)
 
         raise e
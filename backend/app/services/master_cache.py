@@ -0,0 +1,69 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.master_model import Plant, Unit, PlantType
+from app.core.config import (
+    MASTER_CACHE_MAX_ENTRIES,
+    MASTER_CACHE_MAX_ROWS,
+    MASTER_CACHE_TTL_SECONDS
+)
+from app.utils.ttl_cache import TTLCache
+from app.utils.fast_json import dumps
+
+
+# ============================
+# MASTER READ CACHE
+# ============================
+
+# values are (json_body, row_count, next_cursor) pages; size is counted
+# in rows
+master_cache = TTLCache(
+    max_entries=MASTER_CACHE_MAX_ENTRIES,
+    ttl_seconds=MASTER_CACHE_TTL_SECONDS,
+    max_size=MASTER_CACHE_MAX_ROWS,
+    sizeof=lambda page: page[1]
+)
+
+
+def cached_page(key, load):
+
+    # load returns (column_names, row_tuples, next_cursor); the page is
+    # encoded once, so a hit skips both the query and the encoding
+    page = master_cache.get(key)
+
+    if page is None:
+
+        names, rows, next_cursor = load()
+
+        body = dumps([dict(zip(names, row)) for row in rows])
+
+        page = (body, len(rows), next_cursor)
+
+        master_cache.set(key, page)
+
+    return page
+
+
+# the tables behind the cached listings; writes to any other table
+# leave the cache alone
+MASTER_MODELS = (Plant, Unit, PlantType)
+
+
+def invalidate_master_cache():
+
+    # called once master rows are committed; every listing page is
+    # dropped since a new row can land on any of them
+    master_cache.clear()
+
+
+# ============================
+# TABLE FINGERPRINT
+# ============================
+
+def table_fingerprint(db: Session, *keys):
+
+    # highest id of each table; master rows are only ever added, so any
+    # write from any worker process moves it, and every worker computes
+    # the same value. One query, each MAX read off the end of its
+    # primary key index instead of counting the table
+    return tuple(db.execute(select(*(select(func.max(key)).scalar_subquery() for key in keys))).one())
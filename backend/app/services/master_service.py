@@ -1,6 +1,25 @@
+import pandas as pd
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
 from app.models.master_model import Plant, PlantType, Unit
-from app.Schemas.master_schema import PlantCreate, UnitCreate
+from app.Schemas.master_schema import (
+    PlantCreate,
+    UnitCreate,
+    PlantResponse,
+    PlantTypeResponse,
+    UnitResponse
+)
+from app.core.config import MASTER_PAGE_SIZE
+from app.services.master_cache import cached_page, invalidate_master_cache
+from app.services.bulk_insert_service import bulk_insert, clean_value
+from app.services.ingestion_spec import PLANT_SPEC, UNIT_SPEC
+from app.services.validation_service import coerce_chunk
+from app.services.mas_upload_services import (
+    build_rows,
+    drop_duplicates,
+    _chunks,
+    DUPLICATE_LOOKUP_CHUNK
+)
 
 
 def create_plant(db: Session, plant: PlantCreate):
@@ -41,6 +60,8 @@ def create_plant(db: Session, plant: PlantCreate):
 
     db.commit()
 
+    invalidate_master_cache()
+
     db.refresh(db_plant)
 
     return {
@@ -71,6 +92,8 @@ def create_unit(db: Session, unit: UnitCreate):
 
     db.commit()
 
+    invalidate_master_cache()
+
     db.refresh(db_unit)
 
     return {
@@ -82,15 +105,241 @@ def create_unit(db: Session, unit: UnitCreate):
         "unit_id": db_unit.unit_id
 
     }
-def get_plant_types(db: Session):
+# ============================
+# LISTINGS (KEYSET PAGES)
+# ============================
+
+def _page(db: Session, columns, key, filters, after, limit):
+
+    # rows after the cursor in primary key order, as plain tuples of the
+    # selected columns (no ORM objects); one extra row tells whether
+    # another page follows. Cost depends on the page size, not on how
+    # deep the cursor is
+    stmt = select(*columns).where(*filters)
+
+    if after is not None:
+        stmt = stmt.where(key > after)
+
+    rows = db.execute(stmt.order_by(key).limit(limit + 1)).all()
+
+    names = [column.key for column in columns]
+
+    next_cursor = None
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1][names.index(key.key)]
+
+    return names, rows, next_cursor
+
+
+def listing_columns(model, allowed, fields=None):
+
+    # fields projects the listing onto some of the allowed columns; the
+    # primary key always comes along since the cursor is built from it
+    names = list(fields) if fields else list(allowed)
+
+    key = model.__table__.primary_key.columns.values()[0].key
+
+    if key not in names:
+        names.insert(0, key)
+
+    return [getattr(model, name) for name in names]
+
+
+# listing columns, the same set the response models document
+PLANT_TYPE_FIELDS = list(PlantTypeResponse.model_fields)
+PLANT_FIELDS = list(PlantResponse.model_fields)
+UNIT_FIELDS = list(UnitResponse.model_fields)
+
+
+# pages are served from master_cache, keyed by table and arguments;
+# version, the table's fingerprint when the caller has it, keeps a page
+# cached before another process wrote from being served after. Each
+# returns (json_body, row_count, next_cursor)
+
+def get_plant_types(db: Session, after=None, limit=MASTER_PAGE_SIZE, version=None, fields=None):
+
+    columns = listing_columns(PlantType, PLANT_TYPE_FIELDS, fields)
+
+    return cached_page(
+        ("plant_types", version, after, limit, tuple(fields or ())),
+        lambda: _page(db, columns, PlantType.type_id, [], after, limit)
+    )
+
+def get_plants(
+    db: Session,
+    after=None,
+    limit=MASTER_PAGE_SIZE,
+    state=None,
+    district=None,
+    type_id=None,
+    status=None,
+    version=None,
+    fields=None
+):
+
+    key = ("plants", version, after, limit, state, district, type_id, status, tuple(fields or ()))
+
+    filters = []
+
+    if state is not None:
+        filters.append(Plant.state == state)
+
+    if district is not None:
+        filters.append(Plant.district == district)
+
+    if type_id is not None:
+        filters.append(Plant.type_id == type_id)
+
+    if status is not None:
+        filters.append(Plant.status == status)
+
+    columns = listing_columns(Plant, PLANT_FIELDS, fields)
+
+    return cached_page(key, lambda: _page(db, columns, Plant.plant_id, filters, after, limit))
+
+def get_units(
+    db: Session,
+    after=None,
+    limit=MASTER_PAGE_SIZE,
+    plant_id=None,
+    status=None,
+    version=None,
+    fields=None
+):
+
+    key = ("units", version, after, limit, plant_id, status, tuple(fields or ()))
+
+    filters = []
+
+    if plant_id is not None:
+        filters.append(Unit.plant_id == plant_id)
+
+    if status is not None:
+        filters.append(Unit.status == status)
+
+    columns = listing_columns(Unit, UNIT_FIELDS, fields)
+
+    return cached_page(key, lambda: _page(db, columns, Unit.unit_id, filters, after, limit))
+
+
+# ============================
+# BATCH CREATE
+# ============================
+
+def _flag(row_errors, mask, message):
+
+    for index in mask[mask].index:
+        row_errors[index] = f"{row_errors[index]}; {message}" if row_errors[index] else message
+
+
+def _existing(db: Session, values, key_column):
+
+    # which of values exist in key_column, with chunked IN queries
+    candidates = [clean_value(value) for value in values.dropna().unique()]
+
+    found = set()
+
+    for chunk in _chunks(candidates, DUPLICATE_LOOKUP_CHUNK):
+        found.update(
+            value for (value,) in db.query(key_column).filter(key_column.in_(chunk))
+        )
+
+    return values.isin(found) | values.isna()
+
+
+def _generated_ids(db: Session, typed, spec):
+
+    # MySQL has no INSERT ... RETURNING, so new ids are read back by
+    # natural key (the spec's dedup key) inside the same transaction
+    columns = [getattr(spec.model, name) for name in spec.dedup_key]
+    key = spec.model.__table__.primary_key.columns.values()[0]
+
+    keys = [
+        tuple(clean_value(value) for value in row)
+        for row in typed[list(spec.dedup_key)].itertuples(index=False, name=None)
+    ]
+
+    ids = {}
+
+    for chunk in _chunks(keys, DUPLICATE_LOOKUP_CHUNK):
+
+        if len(columns) == 1:
+            condition = columns[0].in_([value[0] for value in chunk])
+        else:
+            condition = tuple_(*columns).in_(chunk)
+
+        for row in db.query(key, *columns).filter(condition):
+            ids[tuple(row[1:])] = row[0]
+
+    return dict(zip(typed.index, (ids.get(value) for value in keys)))
+
+
+def _create_batch(db: Session, spec, items, references):
+
+    # validates every item the way an upload row is validated, inserts
+    # the clean ones with multi-row INSERTs in one transaction and
+    # reports per item, in input order; references are
+    # (column, key_column) pairs that must exist
+    df = pd.DataFrame([item.model_dump() for item in items])
+
+    typed, row_errors = coerce_chunk(df, spec)
+
+    row_errors = row_errors.astype(object)
+
+    for column, key_column in references:
+        _flag(row_errors, ~_existing(db, typed[column], key_column), f"{column} not found")
+
+    clean = typed[row_errors.isna()]
+
+    kept, _ = drop_duplicates(db, clean, spec, set())
+
+    duplicates = clean.index.difference(kept.index)
+
+    _flag(
+        row_errors,
+        pd.Series(typed.index.isin(duplicates), index=typed.index),
+        f"Duplicate {', '.join(spec.dedup_key)}"
+    )
+
+    try:
+
+        bulk_insert(db, spec.model, build_rows(kept, spec))
+
+        ids = _generated_ids(db, kept, spec)
+
+        db.commit()
+
+    except Exception as e:
+
+        db.rollback()
+
+        raise e
+
+    invalidate_master_cache()
+
+    results = [
+        {
+            "index": int(index),
+            "id": ids.get(index),
+            "errors": row_errors[index].split("; ") if row_errors[index] else []
+        }
+        for index in typed.index
+    ]
+
+    return {
+        "inserted": len(kept),
+        "failed": len(typed) - len(kept),
+        "results": results
+    }
 
-    return db.query(PlantType).all()
 
-def get_plants(db: Session):
+def create_plants_batch(db: Session, plants):
 
-    return db.query(Plant).all()
+    return _create_batch(db, PLANT_SPEC, plants, [("type_id", PlantType.type_id)])
 
-def get_units(db: Session):
 
-    return db.query(Unit).all()
+def create_units_batch(db: Session, units):
 
+    return _create_batch(db, UNIT_SPEC, units, [("plant_id", Plant.plant_id)])
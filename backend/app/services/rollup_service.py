@@ -0,0 +1,348 @@
+import calendar
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, literal
+from sqlalchemy.orm import Session
+
+from app.models.master_model import Plant, Unit, PlantType
+from app.models.generation_model import (
+    GenerationReading,
+    GenerationDailyRollup,
+    GenerationMonthlyRollup
+)
+
+
+BLOCK_HOURS = 0.25
+
+BLOCKS_PER_DAY = int(24 / BLOCK_HOURS)
+
+ROLLUP_MODELS = {
+    "daily": GenerationDailyRollup,
+    "monthly": GenerationMonthlyRollup
+}
+
+GROUP_COLUMNS = ("state", "district", "power_source", "plant_id", "unit_id")
+
+
+# ============================
+# HELPERS
+# ============================
+
+def _month_start(day):
+
+    return day.replace(day=1)
+
+
+def _next_month(day):
+
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _month_of(db: Session, column):
+
+    # first day of the column's month, as the backend spells it
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m-01", column)
+
+    return func.date_format(column, "%Y-%m-01")
+
+
+def _days_in_month(db: Session, column):
+
+    if db.get_bind().dialect.name == "sqlite":
+        return func.julianday(func.date(column, "start of month", "+1 month")) - func.julianday(
+            func.date(column, "start of month")
+        )
+
+    return func.day(func.last_day(column))
+
+
+def _expected_blocks(period, day):
+
+    # readings a unit should have in one rollup row
+    if period == "daily":
+        return BLOCKS_PER_DAY
+
+    return BLOCKS_PER_DAY * calendar.monthrange(day.year, day.month)[1]
+
+
+def _unit_filter(stmt, column, unit_ids):
+
+    if unit_ids is None:
+        return stmt
+
+    return stmt.where(column.in_(list(unit_ids)))
+
+
+# ============================
+# REFRESH
+# ============================
+
+def refresh_daily(db: Session, start, end, unit_ids=None):
+
+    # recomputes the daily rows for unit_ids (all units when None) over
+    # days [start, end) straight from the readings, in one
+    # INSERT ... SELECT; capacity is a full day of blocks whatever was
+    # read, blocks counts the readings
+    db.execute(
+        _unit_filter(
+            delete(GenerationDailyRollup)
+            .where(GenerationDailyRollup.rollup_date >= start)
+            .where(GenerationDailyRollup.rollup_date < end),
+            GenerationDailyRollup.unit_id,
+            unit_ids
+        )
+    )
+
+    day = func.date(GenerationReading.reading_ts)
+
+    source = _unit_filter(
+        select(
+            day,
+            GenerationReading.unit_id,
+            Plant.plant_id,
+            Plant.state,
+            Plant.district,
+            PlantType.power_source,
+            func.sum(GenerationReading.generation_mwh),
+            func.max(Unit.unit_capacity_mw) * literal(BLOCKS_PER_DAY * BLOCK_HOURS),
+            func.count()
+        )
+        .join(Unit, Unit.unit_id == GenerationReading.unit_id)
+        .join(Plant, Plant.plant_id == Unit.plant_id)
+        .outerjoin(PlantType, PlantType.type_id == Plant.type_id)
+        .where(GenerationReading.reading_ts >= datetime.combine(start, datetime.min.time()))
+        .where(GenerationReading.reading_ts < datetime.combine(end, datetime.min.time()))
+        .group_by(
+            day,
+            GenerationReading.unit_id,
+            Plant.plant_id,
+            Plant.state,
+            Plant.district,
+            PlantType.power_source
+        ),
+        GenerationReading.unit_id,
+        unit_ids
+    )
+
+    db.execute(
+        insert(GenerationDailyRollup).from_select(
+            [
+                "rollup_date",
+                "unit_id",
+                "plant_id",
+                "state",
+                "district",
+                "power_source",
+                "generation_mwh",
+                "capacity_mwh",
+                "blocks"
+            ],
+            source
+        )
+    )
+
+
+def refresh_monthly(db: Session, start, end, unit_ids=None):
+
+    # rebuilds whole months covering [start, end) from the daily rows;
+    # capacity covers every day of the month, days without readings too
+    start = _month_start(start)
+    end = _next_month(end - timedelta(days=1))
+
+    db.execute(
+        _unit_filter(
+            delete(GenerationMonthlyRollup)
+            .where(GenerationMonthlyRollup.month >= start)
+            .where(GenerationMonthlyRollup.month < end),
+            GenerationMonthlyRollup.unit_id,
+            unit_ids
+        )
+    )
+
+    month = _month_of(db, GenerationDailyRollup.rollup_date)
+
+    source = _unit_filter(
+        select(
+            month,
+            GenerationDailyRollup.unit_id,
+            GenerationDailyRollup.plant_id,
+            GenerationDailyRollup.state,
+            GenerationDailyRollup.district,
+            GenerationDailyRollup.power_source,
+            func.sum(GenerationDailyRollup.generation_mwh),
+            func.max(GenerationDailyRollup.capacity_mwh)
+            * _days_in_month(db, func.min(GenerationDailyRollup.rollup_date)),
+            func.count(),
+            func.sum(GenerationDailyRollup.blocks)
+        )
+        .where(GenerationDailyRollup.rollup_date >= start)
+        .where(GenerationDailyRollup.rollup_date < end)
+        .group_by(
+            month,
+            GenerationDailyRollup.unit_id,
+            GenerationDailyRollup.plant_id,
+            GenerationDailyRollup.state,
+            GenerationDailyRollup.district,
+            GenerationDailyRollup.power_source
+        ),
+        GenerationDailyRollup.unit_id,
+        unit_ids
+    )
+
+    db.execute(
+        insert(GenerationMonthlyRollup).from_select(
+            [
+                "month",
+                "unit_id",
+                "plant_id",
+                "state",
+                "district",
+                "power_source",
+                "generation_mwh",
+                "capacity_mwh",
+                "days",
+                "blocks"
+            ],
+            source
+        )
+    )
+
+
+def track_readings(typed, spans):
+
+    # upload hook, per inserted chunk: widens spans (unit_id -> [first
+    # day, last day]) to the readings typed holds
+    if typed.empty:
+        return
+
+    days = typed.groupby("unit_id")["reading_ts"].agg(["min", "max"])
+
+    for unit_id, first, last in days.itertuples(name=None):
+
+        unit_id = int(unit_id)
+        first = first.date()
+        last = last.date()
+
+        if unit_id in spans:
+            first = min(first, spans[unit_id][0])
+            last = max(last, spans[unit_id][1])
+
+        spans[unit_id] = (first, last)
+
+
+def refresh_for_readings(db: Session, spans):
+
+    # upload hook, once before the upload commits: recomputes the units x
+    # days the upload's readings span; units loaded over the same days
+    # share one refresh
+    groups = {}
+
+    for unit_id, (first, last) in spans.items():
+        groups.setdefault((first, last + timedelta(days=1)), []).append(unit_id)
+
+    for (start, end), unit_ids in groups.items():
+
+        refresh_daily(db, start, end, sorted(unit_ids))
+        refresh_monthly(db, start, end, sorted(unit_ids))
+
+
+def rebuild_rollups(db: Session, start, end, unit_ids=None):
+
+    # backfill, one committed month at a time so a long rebuild never
+    # holds one huge transaction
+    months = 0
+
+    month = _month_start(start)
+
+    while month < end:
+
+        stop = min(_next_month(month), end)
+
+        refresh_daily(db, max(month, start), stop, unit_ids)
+        refresh_monthly(db, max(month, start), stop, unit_ids)
+
+        db.commit()
+
+        months += 1
+        month = _next_month(month)
+
+    return months
+
+
+# ============================
+# READ
+# ============================
+
+def get_rollups(
+    db: Session,
+    period,
+    group_by,
+    start,
+    end,
+    state=None,
+    district=None,
+    power_source=None,
+    plant_id=None
+):
+
+    model = ROLLUP_MODELS[period]
+
+    period_column = model.rollup_date if period == "daily" else model.month
+
+    if period == "monthly":
+        start = _month_start(start)
+
+    groups = [getattr(model, name) for name in group_by]
+
+    generation = func.sum(model.generation_mwh)
+    capacity = func.sum(model.capacity_mwh)
+    blocks = func.sum(model.blocks)
+
+    stmt = (
+        select(
+            period_column.label("period"),
+            *groups,
+            generation.label("generation_mwh"),
+            capacity.label("capacity_mwh"),
+            blocks.label("blocks"),
+            func.count().label("rows")
+        )
+        .where(period_column >= start)
+        .where(period_column <= end)
+        .group_by(period_column, *groups)
+        .order_by(period_column, *groups)
+    )
+
+    filters = {
+        "state": state,
+        "district": district,
+        "power_source": power_source,
+        "plant_id": plant_id
+    }
+
+    for name, value in filters.items():
+        if value is not None:
+            stmt = stmt.where(getattr(model, name) == value)
+
+    results = []
+
+    for row in db.execute(stmt).mappings():
+
+        generation_mwh = float(row["generation_mwh"] or 0)
+        capacity_mwh = float(row["capacity_mwh"] or 0)
+
+        # share of the expected readings behind the row; a low PLF with
+        # low coverage is missing data rather than an idle unit
+        expected = row["rows"] * _expected_blocks(period, row["period"])
+
+        results.append({
+            "period": row["period"],
+            **{name: row[name] for name in group_by},
+            "generation_mwh": round(generation_mwh, 3),
+            "capacity_mwh": round(capacity_mwh, 3),
+            "plf": round(generation_mwh / capacity_mwh, 4) if capacity_mwh else None,
+            "coverage": round(int(row["blocks"] or 0) / expected, 4)
+        })
+
+    return results
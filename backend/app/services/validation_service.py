@@ -0,0 +1,223 @@
+import numpy as np
+import pandas as pd
+
+
+# DECIMAL(10,2) tops out just below this; used when a field's column
+# has no declared precision
+DECIMAL_LIMIT = 10 ** 8
+DECIMAL_SCALE = 2
+
+
+# ============================
+# HELPERS
+# ============================
+
+def _column(df, name):
+
+    if name in df.columns:
+        return df[name]
+
+    return pd.Series(None, index=df.index, dtype=object)
+
+
+def _stripped(series):
+
+    # strings are trimmed and blanks become missing; other types pass through
+    if series.dtype != object and not pd.api.types.is_string_dtype(series):
+        return series
+
+    present = series.notna()
+
+    text = series.where(~present, series.astype(str).str.strip())
+
+    return text.where(~present | (text != ""), None).astype(object)
+
+
+def _as_text(series):
+
+    # whole-number floats (a code column with blanks) should read "101",
+    # not "101.0"
+    if pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+        series = series.astype("Int64")
+
+    text = pd.Series(None, index=series.index, dtype=object)
+
+    present = series.notna()
+    text[present] = series[present].astype(str)
+
+    return text
+
+
+def _flag(errors, mask, message):
+
+    mask = mask.fillna(False).astype(bool)
+
+    if mask.any():
+        errors[mask] = errors[mask] + message + "; "
+
+
+# ============================
+# COERCERS PER DTYPE
+# ============================
+
+def _coerce_string(raw, field, errors):
+
+    values = _as_text(raw)
+
+    if field.max_length:
+
+        lengths = values[values.notna()].astype(str).str.len()
+        too_long = (lengths > field.max_length).reindex(values.index, fill_value=False)
+
+        _flag(errors, too_long, f"{field.name} longer than {field.max_length} characters")
+
+    return values
+
+
+def _coerce_integer(raw, field, errors):
+
+    numbers = pd.to_numeric(raw, errors="coerce")
+
+    bad = raw.notna() & (numbers.isna() | (numbers % 1 != 0))
+
+    _flag(errors, bad, f"{field.name} must be an integer")
+
+    return numbers.where(~bad).astype("Int64")
+
+
+def _coerce_decimal(raw, field, errors):
+
+    scale = DECIMAL_SCALE if field.scale is None else field.scale
+    limit = DECIMAL_LIMIT if field.precision is None else 10 ** (field.precision - scale)
+
+    numbers = pd.to_numeric(raw, errors="coerce")
+
+    _flag(errors, raw.notna() & numbers.isna(), f"{field.name} must be a number")
+    _flag(errors, numbers < 0, f"{field.name} must not be negative")
+    _flag(errors, numbers >= limit, f"{field.name} is too large")
+
+    return numbers.round(scale)
+
+
+def _coerce_date(raw, field, errors):
+
+    # ISO dates (and Excel datetimes) first, then day-first text such
+    # as 05/01/2020 for whatever is left
+    dates = pd.to_datetime(raw, errors="coerce", format="%Y-%m-%d", exact=False)
+
+    rest = raw.notna() & dates.isna()
+
+    if rest.any():
+        dates[rest] = pd.to_datetime(raw[rest], errors="coerce", dayfirst=True)
+
+    _flag(errors, raw.notna() & dates.isna(), f"{field.name} is not a valid date")
+
+    return dates
+
+
+def _coerce_datetime(raw, field, errors):
+
+    # ISO timestamps (2024-01-05 00:15, with or without seconds) and
+    # Excel datetimes first, then day-first text such as 05/01/2024 00:15
+    stamps = pd.to_datetime(raw, errors="coerce", format="ISO8601")
+
+    rest = raw.notna() & stamps.isna()
+
+    if rest.any():
+        stamps[rest] = pd.to_datetime(raw[rest], errors="coerce", dayfirst=True)
+
+    _flag(errors, raw.notna() & stamps.isna(), f"{field.name} is not a valid timestamp")
+
+    return stamps
+
+
+def _coerce_enum(raw, field, errors):
+
+    values = _as_text(raw)
+    values = values.where(values.isna(), values.str.upper())
+
+    _flag(
+        errors,
+        values.notna() & ~values.isin(field.choices),
+        f"{field.name} must be one of {', '.join(field.choices)}"
+    )
+
+    return values
+
+
+COERCERS = {
+    "string": _coerce_string,
+    "integer": _coerce_integer,
+    "decimal": _coerce_decimal,
+    "date": _coerce_date,
+    "datetime": _coerce_datetime,
+    "enum": _coerce_enum
+}
+
+
+# ============================
+# COERCE AND VALIDATE
+# ============================
+
+def coerce_chunk(df, spec, check_required=True):
+
+    # column-wise type coercion for one normalized chunk, driven by the
+    # category spec; returns the typed frame and a per-row error string
+    # (None for clean rows)
+    errors = pd.Series("", index=df.index, dtype=object)
+    typed = pd.DataFrame(index=df.index)
+
+    raw = {field.name: _stripped(_column(df, field.name)) for field in spec.fields}
+
+    # a row may name a reference by natural key instead of id (a unit's
+    # plant_code); the key is kept so resolve_references can fill the id
+    # in after coercion
+    sources = {ref.target: _stripped(_column(df, ref.source)) for ref in spec.references}
+
+    if check_required:
+        for name in spec.required:
+
+            missing = raw[name].isna()
+
+            if name in sources:
+                missing &= sources[name].isna()
+
+            _flag(errors, missing, f"{name} required")
+
+    for field in spec.fields:
+        typed[field.name] = COERCERS[field.dtype](raw[field.name], field, errors)
+
+    for ref in spec.references:
+        if ref.source not in typed.columns:
+            typed[ref.source] = _as_text(sources[ref.target])
+
+    if "retirement_date" in typed.columns and "commissioning_date" in typed.columns:
+        _flag(
+            errors,
+            typed["retirement_date"] < typed["commissioning_date"],
+            "retirement_date is before commissioning_date"
+        )
+
+    for field in spec.fields:
+        if field.fallback:
+            typed[field.name] = typed[field.name].fillna(typed[field.fallback])
+
+    typed = typed.fillna(spec.defaults)
+
+    for field in spec.fields:
+
+        if field.dtype == "date":
+            column = typed[field.name]
+            typed[field.name] = column.dt.date.astype(object).where(column.notna(), None)
+
+        if field.dtype == "datetime":
+            # to_pydatetime() comes back as a 0..n-1 Series on pandas 3;
+            # as a bare array it takes the chunk's file-wide index as is
+            column = typed[field.name]
+            typed[field.name] = pd.Series(
+                np.asarray(column.dt.to_pydatetime()), index=column.index, dtype=object
+            ).where(column.notna(), None)
+
+    row_errors = errors.str.rstrip("; ").where(errors != "", None)
+
+    return typed, row_errors
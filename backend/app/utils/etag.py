@@ -0,0 +1,32 @@
+import hashlib
+
+
+# ============================
+# CONDITIONAL GET
+# ============================
+
+def make_etag(request, *parts):
+
+    # weak tag over the path, the query string and whatever describes
+    # the data's current version
+    query = sorted(request.query_params.multi_items())
+
+    digest = hashlib.sha1(repr((request.url.path, query, parts)).encode()).hexdigest()
+
+    return f'W/"{digest[:20]}"'
+
+
+def etag_matches(request, etag):
+
+    header = request.headers.get("if-none-match")
+
+    if not header:
+        return False
+
+    if header.strip() == "*":
+        return True
+
+    # weak comparison: W/ prefixes are ignored on both sides
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+    return etag.removeprefix("W/") in tags
@@ -0,0 +1,39 @@
+from datetime import date, datetime
+from decimal import Decimal
+import enum
+import json
+
+# orjson is optional; the stdlib encoder gives the same output, slower
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# ============================
+# JSON ENCODING
+# ============================
+
+def _default(value):
+
+    # DECIMAL columns go out as strings, the way Pydantic sends them, so
+    # no precision is lost
+    if isinstance(value, Decimal):
+        return str(value)
+
+    if isinstance(value, enum.Enum):
+        return value.value
+
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value):
+
+    # returns bytes, ready to be a response body
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
@@ -1,20 +1,257 @@
+import hashlib
 import pandas as pd
 
+from app.core.config import UPLOAD_CHUNK_ROWS, EXCEL_ENGINE
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+
+
 def read_file(upload_file):
-    filename=upload_file.filename.lower()
-
-    if filename.endswith("xlsx") or filename.endwith(".xls"):
-        return pd.read_excel(upload_file.file)
-    
-    elif filename.endswith("csv"):
-        return pd.read_csv(upload_file.file)
-    
+
+    # whole-file read, kept for callers that want one DataFrame; goes
+    # through the same readers as the streaming path
+    chunks = list(iter_file_chunks(upload_file))
+
+    if not chunks:
+        return pd.DataFrame()
+
+    df = pd.concat(chunks)
+
+    df.columns = df.columns.astype(str).str.strip().str.lower()
+
+    return df
+
+
+# ============================
+# EXCEL READER BACKENDS
+# ============================
+
+class OpenpyxlWorkbook:
+
+    # read_only mode streams rows from the sheet XML instead of
+    # building the whole workbook in memory
+
+    def __init__(self, file):
+
+        from openpyxl import load_workbook
+
+        self.book = load_workbook(file, read_only=True, data_only=True)
+        self.sheet_names = list(self.book.sheetnames)
+
+
+    def iter_rows(self, sheet_name=None):
+
+        sheet = self.book[sheet_name] if sheet_name else self.book.active
+
+        return sheet.iter_rows(values_only=True)
+
+
+    def close(self):
+
+        self.book.close()
+
+
+class CalamineWorkbook:
+
+    # Rust-backed reader (python-calamine), several times faster than
+    # openpyxl on large sheets and also reads legacy .xls, but a sheet
+    # is loaded whole, so only chosen through EXCEL_ENGINE
+
+    def __init__(self, file):
+
+        from python_calamine import CalamineWorkbook as Workbook
+
+        self.book = Workbook.from_filelike(file)
+        self.sheet_names = list(self.book.sheet_names)
+
+
+    def iter_rows(self, sheet_name=None):
+
+        sheet = self.book.get_sheet_by_name(sheet_name or self.sheet_names[0])
+
+        # calamine reports empty cells as ""
+        for values in sheet.iter_rows():
+            yield tuple(None if value == "" else value for value in values)
+
+
+    def close(self):
+
+        self.book.close()
+
+
+def excel_engine():
+
+    # openpyxl unless EXCEL_ENGINE opts in to calamine
+    if EXCEL_ENGINE != "auto":
+        return EXCEL_ENGINE
+
+    try:
+        import python_calamine  # noqa: F401
+        return "calamine"
+    except ImportError:
+        return "openpyxl"
+
+
+def open_workbook(file):
+
+    if excel_engine() == "calamine":
+        return CalamineWorkbook(file)
+
+    return OpenpyxlWorkbook(file)
+
+
+# ============================
+# STREAMING READERS
+# ============================
+
+def _cell_text(value):
+
+    # every reader hands the spec's coercers text, so a column's type
+    # never depends on which rows share its chunk; whole-number floats
+    # (calamine reads every number as float) lose the ".0" so codes stay
+    # "101", not "101.0"
+    if value is None or value != value:
+        return None
+
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+
+    return str(value)
+
+
+def _frame(rows, columns, offset):
+
+    width = len(columns)
+
+    rows = [
+        tuple(_cell_text(value) for value in values[:width]) + (None,) * (width - len(values))
+        for values in rows
+    ]
+
+    return pd.DataFrame(
+        rows,
+        columns=columns,
+        index=pd.RangeIndex(offset, offset + len(rows)),
+        dtype=object
+    )
+
+
+def iter_row_chunks(rows, chunk_rows):
+
+    # first row is the header; fully empty rows are skipped
+    header = next(rows, None)
+
+    if header is None:
+        return
+
+    columns = [
+        str(value) if value is not None else f"unnamed_{i}"
+        for i, value in enumerate(header)
+    ]
+
+    offset = 0
+    buffer = []
+
+    for values in rows:
+
+        if all(value is None for value in values):
+            continue
+
+        buffer.append(values)
+
+        if len(buffer) == chunk_rows:
+            yield _frame(buffer, columns, offset)
+            offset += len(buffer)
+            buffer = []
+
+    if buffer:
+        yield _frame(buffer, columns, offset)
+
+
+def _iter_excel_chunks(file, chunk_rows, sheet_name=None):
+
+    workbook = open_workbook(file)
+
+    try:
+        yield from iter_row_chunks(iter(workbook.iter_rows(sheet_name)), chunk_rows)
+
+    finally:
+        workbook.close()
+
+
+def iter_file_chunks(upload_file, chunk_rows=None):
+
+    # yields DataFrames of at most chunk_rows rows; the index keeps
+    # counting across chunks so row numbers stay file-wide
+    chunk_rows = chunk_rows or UPLOAD_CHUNK_ROWS
+
+    filename = upload_file.filename.lower()
+
+    if filename.endswith(".xls") and excel_engine() != "calamine":
+        # openpyxl cannot open legacy .xls, slice it after a full read
+        df = pd.read_excel(upload_file.file, dtype=object).map(_cell_text)
+
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+    elif filename.endswith(EXCEL_EXTENSIONS):
+        yield from _iter_excel_chunks(upload_file.file, chunk_rows)
+
+    elif filename.endswith(".csv"):
+        # read as text with only blank cells missing, like the Excel
+        # readers; per-chunk inference would turn "007" into 7 in one
+        # chunk and keep it in the next
+        yield from pd.read_csv(
+            upload_file.file,
+            chunksize=chunk_rows,
+            dtype=object,
+            keep_default_na=False,
+            na_values=[""]
+        )
+
     else:
         raise Exception("Unsupported file format")
-    
-    df.columns=df.columns.str.strip().str.lower()
 
-    return df
-    
 
-    
\ No newline at end of file
+def iter_workbook_sheets(upload_file, select_sheets, chunk_rows=None):
+
+    # opens the workbook once; select_sheets gets the sheet names and
+    # returns the ones to read, in order. Yields (sheet_name, chunks) and
+    # each sheet's chunks must be consumed before the next
+    chunk_rows = chunk_rows or UPLOAD_CHUNK_ROWS
+
+    workbook = open_workbook(upload_file.file)
+
+    try:
+
+        for sheet_name in select_sheets(workbook.sheet_names):
+            rows = iter(workbook.iter_rows(sheet_name))
+            yield sheet_name, iter_row_chunks(rows, chunk_rows)
+
+    finally:
+        workbook.close()
+
+
+# ============================
+# CONTENT HASH
+# ============================
+
+HASH_BUFFER = 1024 * 1024
+
+
+def file_digest(upload_file):
+
+    # streams the upload through sha256 and rewinds it for the parser;
+    # returns the hex digest and the size in bytes
+    digest = hashlib.sha256()
+    size = 0
+
+    upload_file.file.seek(0)
+
+    for block in iter(lambda: upload_file.file.read(HASH_BUFFER), b""):
+        digest.update(block)
+        size += len(block)
+
+    upload_file.file.seek(0)
+
+    return digest.hexdigest(), size
@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+import os
+import time
+
+# resource is POSIX only; without it peak memory is simply not recorded
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# ============================
+# MEMORY
+# ============================
+
+def current_rss():
+
+    # resident set size in bytes: /proc where it exists, else the
+    # process peak from getrusage (kilobytes on Linux, bytes on macOS)
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+# ============================
+# STAGE TIMER
+# ============================
+
+class StageTimer:
+
+    # wall time, rows and call count per named stage of one ingestion,
+    # plus the highest RSS seen when a stage finished; stages repeat per
+    # chunk and accumulate
+
+    def __init__(self):
+
+        self.stages = {}
+        self.started = time.perf_counter()
+
+
+    def add(self, name, seconds, rows=0, calls=1, peak_rss=None):
+
+        entry = self.stages.setdefault(
+            name,
+            {"seconds": 0.0, "rows": 0, "calls": 0, "peak_rss": None}
+        )
+
+        entry["seconds"] += seconds
+        entry["rows"] += rows
+        entry["calls"] += calls
+
+        if peak_rss is None:
+            peak_rss = current_rss()
+
+        if peak_rss is not None:
+            entry["peak_rss"] = max(entry["peak_rss"] or 0, peak_rss)
+
+
+    @contextmanager
+    def stage(self, name, rows=0):
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, rows)
+
+
+    def iterate(self, iterable, name):
+
+        # times the producer side of an iterator (file reading), each
+        # item counted as len(item) rows
+        iterator = iter(iterable)
+
+        while True:
+
+            start = time.perf_counter()
+
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, time.perf_counter() - start, calls=0)
+                return
+
+            self.add(name, time.perf_counter() - start, len(item))
+
+            yield item
+
+
+    def merge(self, stages):
+
+        # stages timed elsewhere, e.g. in a parse worker process
+        for name, entry in stages.items():
+            self.add(name, entry["seconds"], entry["rows"], entry["calls"], entry["peak_rss"])
+
+
+    def elapsed(self):
+
+        return time.perf_counter() - self.started
+
+
+    def peak_rss(self):
+
+        peaks = [entry["peak_rss"] for entry in self.stages.values() if entry["peak_rss"]]
+
+        return max(peaks) if peaks else None
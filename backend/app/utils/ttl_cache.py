@@ -0,0 +1,129 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+# ============================
+# BOUNDED TTL CACHE
+# ============================
+
+class TTLCache:
+
+    # LRU cache bounded by entry count, by total size (as measured by
+    # sizeof) and by age; safe to share between worker threads
+
+    def __init__(self, max_entries, ttl_seconds, max_size=None, sizeof=None):
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.sizeof = sizeof or (lambda value: 0)
+
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def get(self, key):
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, expires_at = entry
+
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+
+    def set(self, key, value):
+
+        size = self.sizeof(value)
+
+        # an entry that can never fit is not cached at all
+        if self.max_size is not None and size > self.max_size:
+            return False
+
+        with self._lock:
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+            self._size += size
+
+            self._evict()
+
+        return True
+
+
+    def pop(self, key):
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            self._remove(key)
+
+            return entry[0]
+
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+    def stats(self):
+
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+    def _remove(self, key):
+
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+
+    def _evict(self):
+
+        now = time.monotonic()
+
+        for key in [k for k, (_, _, expires_at) in self._entries.items() if expires_at <= now]:
+            self._remove(key)
+            self.evictions += 1
+
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_size is not None and self._size > self.max_size)
+        ):
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
@@ -0,0 +1,57 @@
+import pandas as pd
+from sqlalchemy import insert
+
+from app.core.database import Base, SessionLocal, bind_engine, make_engine
+from app.models.master_model import Plant, PlantType
+from app.models.generation_model import GenerationReading  # noqa: F401 (registers the tables)
+from app.services.bulk_insert_service import bulk_insert, clean_row
+from app.services.master_cache import invalidate_master_cache
+from app.services.mas_upload_services import preview_cache
+
+from benchmarks.synthetic_data import generate_plants
+
+
+PLANT_TYPES = [
+    {"type_id": 1, "power_source": "Solar", "fuel_type": None, "is_renewable": 1},
+    {"type_id": 2, "power_source": "Coal", "fuel_type": "Coal", "is_renewable": 0}
+]
+
+
+# ============================
+# SCRATCH DATABASE
+# ============================
+
+def bind_database(url):
+
+    # repoints the app's engine and session factory; must run before
+    # app.main is imported so create_all and the routes see it
+    return bind_engine(make_engine(url))
+
+
+def reset_database(engine, plant_rows=0):
+
+    # empty tables with the plant types, plus plant_rows clean plants
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    invalidate_master_cache()
+    preview_cache.clear()
+
+    db = SessionLocal()
+
+    try:
+
+        db.execute(insert(PlantType), PLANT_TYPES)
+
+        if plant_rows:
+
+            plants = generate_plants(plant_rows)
+            plants.insert(0, "plant_id", range(1, plant_rows + 1))
+            plants["commissioning_date"] = pd.to_datetime(plants["commissioning_date"]).dt.date
+
+            bulk_insert(db, Plant, [clean_row(row) for row in plants.to_dict("records")])
+
+        db.commit()
+
+    finally:
+        db.close()
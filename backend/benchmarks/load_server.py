@@ -0,0 +1,36 @@
+import argparse
+
+import uvicorn
+
+from benchmarks.bench_db import bind_database, reset_database
+
+
+# the app on a scratch database, started by benchmarks.run_load_test; can
+# also be run by hand from the backend folder:
+#   python -m benchmarks.load_server --database-url sqlite:///load.db --port 8765
+# the tables of --database-url are dropped and reseeded
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Serve the app on a reseeded scratch database")
+
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed-plants", type=int, default=5000)
+
+    args = parser.parse_args()
+
+    engine = bind_database(args.database_url)
+
+    reset_database(engine, args.seed_plants)
+
+    # imported only now so the app binds to the scratch engine
+    from app.main import app
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+import argparse
+import asyncio
+from collections import Counter
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.synthetic_data import generate_plants
+
+
+# mixed read / upload traffic against a running app, run from the
+# backend folder:
+#   python -m benchmarks.run_load_test --concurrency 32 --duration 30
+#   python -m benchmarks.run_load_test --mix plants=70,preview=20,confirm=10 --output load.json
+# without --base-url it starts benchmarks.load_server on a scratch
+# database (a temporary SQLite file unless --database-url is given),
+# spooling uploads into the same temporary folder
+# a confirm answers 202 once the file is queued, so its latency is only
+# the hand-off; the background jobs are polled to the end after the
+# traffic stops and their time to completion is reported on its own
+
+
+# each uploaded file gets its own plant codes: MARKER is swapped for a
+# request counter, so confirms insert rows instead of only finding
+# duplicates
+MARKER = b"@@"
+
+DEFAULT_MIX = "plants=80,preview=15,confirm=5"
+
+
+# ============================
+# ROUTES
+# ============================
+
+def _upload(path):
+
+    async def send(client, context):
+
+        number = next(context["counter"])
+
+        body = context["payload"].replace(MARKER, str(number).encode())
+
+        response = await client.post(
+            path,
+            params={"data_type": "plant"},
+            files={"file": (f"load_{number}.csv", body, "text/csv")}
+        )
+
+        # a queued ingestion job, followed up by wait_for_jobs
+        if response.status_code == 202:
+            context["jobs"].append(response.json()["file_id"])
+
+        return response
+
+    return send
+
+
+async def _list_plants(client, context):
+
+    # random keyset positions so the master cache sees varied pages
+    return await client.get(
+        "/master/plants",
+        params={"limit": context["page_size"], "after": context["rng"].randrange(context["seed_plants"] or 1)}
+    )
+
+
+ROUTES = {
+    "plants": _list_plants,
+    "preview": _upload("/master-upload/preview"),
+    "confirm": _upload("/master-upload/confirm")
+}
+
+
+def parse_mix(text):
+
+    mix = {}
+
+    for part in text.split(","):
+
+        name, _, weight = part.partition("=")
+        name = name.strip()
+
+        if name not in ROUTES:
+            raise ValueError(f"unknown route {name!r}, expected one of {', '.join(ROUTES)}")
+
+        mix[name] = float(weight or 1)
+
+    return mix
+
+
+def upload_payload(rows, invalid_ratio, seed):
+
+    df = generate_plants(rows, 0.0, invalid_ratio, seed)
+
+    df["plant_code"] = MARKER.decode() + "-" + df["plant_code"].astype(str)
+
+    return df.to_csv(index=False).encode()
+
+
+# ============================
+# TRAFFIC
+# ============================
+
+async def _client(context, mix, deadline, samples):
+
+    names = list(mix)
+    weights = list(mix.values())
+
+    client = context["client"]
+
+    while time.perf_counter() < deadline:
+
+        name = context["rng"].choices(names, weights)[0]
+
+        started = time.perf_counter()
+
+        try:
+            response = await ROUTES[name](client, context)
+
+            status = response.status_code
+            queries = response.headers.get("X-DB-Query-Count")
+
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+            queries = None
+
+        samples.append((name, time.perf_counter() - started, status, queries))
+
+
+async def wait_for_jobs(client, file_ids, timeout, interval=0.5):
+
+    # polls every queued job until none is PROCESSING (or timeout runs
+    # out); returns their last statuses
+    jobs = {}
+
+    waiting = list(file_ids)
+
+    deadline = time.perf_counter() + timeout
+
+    while waiting:
+
+        responses = await asyncio.gather(*(
+            client.get(f"/master-upload/jobs/{file_id}") for file_id in waiting
+        ))
+
+        for file_id, response in zip(waiting, responses):
+
+            if response.status_code == 200:
+                jobs[file_id] = response.json()
+            else:
+                jobs[file_id] = {"file_id": file_id, "status": f"HTTP {response.status_code}"}
+
+        waiting = [file_id for file_id in waiting if jobs[file_id]["status"] == "PROCESSING"]
+
+        if waiting and time.perf_counter() < deadline:
+            await asyncio.sleep(interval)
+        else:
+            break
+
+    return list(jobs.values())
+
+
+async def drive(base_url, mix, concurrency, duration, context, job_timeout):
+
+    samples = []
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+
+        context["client"] = client
+
+        started = time.perf_counter()
+        deadline = started + duration
+
+        await asyncio.gather(*(
+            _client(context, mix, deadline, samples) for _ in range(concurrency)
+        ))
+
+        elapsed = time.perf_counter() - started
+
+        jobs = await wait_for_jobs(client, context["jobs"], job_timeout)
+
+        drain = time.perf_counter() - started - elapsed
+
+    return samples, elapsed, jobs, drain
+
+
+# ============================
+# REPORT
+# ============================
+
+def _route_stats(samples, elapsed):
+
+    latencies = np.array([seconds for _, seconds, _, _ in samples]) * 1000
+
+    statuses = Counter(str(status) for _, _, status, _ in samples)
+
+    errors = sum(
+        count for status, count in statuses.items()
+        if not status.isdigit() or int(status) >= 400
+    )
+
+    queries = [int(count) for _, _, _, count in samples if count is not None]
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4),
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "mean_ms": round(float(latencies.mean()), 1),
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+        "max_ms": round(float(latencies.max()), 1),
+        "db_queries_mean": round(sum(queries) / len(queries), 1) if queries else None,
+        "statuses": dict(statuses)
+    }
+
+
+def summarize(samples, elapsed):
+
+    by_route = {}
+
+    for sample in samples:
+        by_route.setdefault(sample[0], []).append(sample)
+
+    routes = {name: _route_stats(route_samples, elapsed) for name, route_samples in sorted(by_route.items())}
+
+    if samples:
+        routes["all"] = _route_stats(samples, elapsed)
+
+    return routes
+
+
+def _timestamp(text):
+
+    return datetime.fromisoformat(text) if text else None
+
+
+def job_stats(jobs, drain):
+
+    # queued upload to finished job, from the timestamps of the ingestion
+    # log; drain is how long the jobs ran on after the traffic stopped
+    statuses = Counter(job["status"] for job in jobs)
+
+    seconds = []
+
+    for job in jobs:
+
+        uploaded = _timestamp(job.get("uploaded_at"))
+        finished = _timestamp(job.get("finished_at"))
+
+        if uploaded and finished:
+            seconds.append((finished - uploaded).total_seconds())
+
+    stats = {
+        "jobs": len(jobs),
+        "statuses": dict(statuses),
+        "drain_seconds": round(drain, 2)
+    }
+
+    if seconds:
+
+        p50, p95 = np.percentile(seconds, [50, 95])
+
+        stats.update(
+            completion_p50_s=round(float(p50), 2),
+            completion_p95_s=round(float(p95), 2),
+            completion_max_s=round(max(seconds), 2)
+        )
+
+    return stats
+
+
+def print_summary(routes):
+
+    print(
+        f"{'route':<8} {'requests':>8} {'errors':>7} {'err %':>6} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}"
+    )
+
+    for name, stats in routes.items():
+
+        print(
+            f"{name:<8} {stats['requests']:>8} {stats['errors']:>7} {stats['error_rate'] * 100:>6.1f} "
+            f"{stats['throughput_rps']:>8.1f} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+            f"{stats['p99_ms']:>8.1f} {stats['db_queries_mean'] or 0:>8.1f}"
+        )
+
+
+def print_jobs(stats):
+
+    statuses = ", ".join(f"{status} {count}" for status, count in sorted(stats["statuses"].items()))
+
+    print(f"\nupload jobs: {stats['jobs']} ({statuses or 'none'}), drained {stats['drain_seconds']:.1f} s after the traffic")
+
+    if "completion_p50_s" in stats:
+        print(
+            f"time to completion: p50 {stats['completion_p50_s']:.2f} s, "
+            f"p95 {stats['completion_p95_s']:.2f} s, max {stats['completion_max_s']:.2f} s"
+        )
+
+    if stats["statuses"].get("PROCESSING"):
+        print("some jobs were still PROCESSING at --job-timeout")
+
+
+# ============================
+# SERVER
+# ============================
+
+def _free_port():
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url, seed_plants, spool_dir, timeout=120):
+
+    # benchmarks.load_server in a child process, spooling uploads into
+    # spool_dir; returns it with its base url once the app answers
+    port = _free_port()
+
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.load_server",
+            "--database-url", database_url,
+            "--port", str(port),
+            "--seed-plants", str(seed_plants)
+        ],
+        cwd=Path(__file__).resolve().parent.parent,
+        env={**os.environ, "UPLOAD_SPOOL_DIR": str(spool_dir)}
+    )
+
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.perf_counter() + timeout
+
+    while time.perf_counter() < deadline:
+
+        if process.poll() is not None:
+            raise RuntimeError(f"load server exited with code {process.returncode}")
+
+        try:
+            if httpx.get(f"{base_url}/master/plant-types", timeout=2).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+
+        time.sleep(0.25)
+
+    stop_server(process)
+
+    raise RuntimeError("load server did not start in time")
+
+
+def stop_server(process):
+
+    process.terminate()
+
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# ============================
+# MAIN
+# ============================
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Drive mixed read / upload traffic at the app")
+
+    parser.add_argument("--base-url", help="an app that is already running; skips starting one")
+    parser.add_argument("--database-url", help="scratch database for the started app, its tables are dropped")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of traffic")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="route=weight pairs, routes: " + ", ".join(ROUTES))
+    parser.add_argument("--seed-plants", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--upload-rows", type=int, default=200)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--job-timeout", type=float, default=600, help="seconds to wait for queued uploads to finish")
+    parser.add_argument("--output", type=Path, help="results JSON")
+
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    context = {
+        "rng": random.Random(args.seed),
+        "counter": iter(range(1, sys.maxsize)),
+        "payload": upload_payload(args.upload_rows, args.invalid_ratio, args.seed),
+        "page_size": args.page_size,
+        "seed_plants": args.seed_plants,
+        "jobs": []
+    }
+
+    process = None
+    scratch = None
+    base_url = args.base_url
+
+    try:
+
+        if base_url is None:
+
+            # the scratch database and spooled uploads, removed at the end
+            scratch = Path(tempfile.mkdtemp(prefix="load-"))
+
+            database_url = args.database_url or f"sqlite:///{scratch / 'load.db'}"
+
+            process, base_url = start_server(database_url, args.seed_plants, scratch / "uploads")
+
+        samples, elapsed, jobs, drain = asyncio.run(
+            drive(base_url, mix, args.concurrency, args.duration, context, args.job_timeout)
+        )
+
+    finally:
+
+        if process is not None:
+            stop_server(process)
+
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    routes = summarize(samples, elapsed)
+    jobs = job_stats(jobs, drain)
+
+    print_summary(routes)
+    print_jobs(jobs)
+
+    if args.output:
+
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+
+        args.output.write_text(json.dumps({
+            "base_url": base_url,
+            "concurrency": args.concurrency,
+            "duration": round(elapsed, 2),
+            "mix": mix,
+            "upload_rows": args.upload_rows,
+            "routes": routes,
+            "jobs": jobs
+        }, indent=2))
+
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
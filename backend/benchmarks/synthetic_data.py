@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+
+STATES = {
+    "Rajasthan": ["Jodhpur", "Jaisalmer", "Bikaner", "Barmer"],
+    "Gujarat": ["Kutch", "Jamnagar", "Banaskantha", "Surat"],
+    "Tamil Nadu": ["Tirunelveli", "Thoothukudi", "Coimbatore", "Ramanathapuram"],
+    "Maharashtra": ["Nagpur", "Chandrapur", "Satara", "Pune"]
+}
+
+AGENCIES = ["NTPC", "SECI", "State Genco", "Private IPP"]
+
+SECTORS = ["Central", "State", "Private"]
+
+
+# ============================
+# HELPERS
+# ============================
+
+def _codes(prefix, numbers, width=7):
+
+    return prefix + pd.Series(numbers).astype(str).str.zfill(width)
+
+
+def _dates(rng, rows):
+
+    days = rng.integers(0, 365 * 30, rows)
+
+    return (pd.Timestamp("1995-01-01") + pd.to_timedelta(days, unit="D")).strftime("%Y-%m-%d")
+
+
+def _pick_rows(rng, rows, ratio, exclude=None):
+
+    # positions of round(rows * ratio) distinct rows, never row 0 so a
+    # duplicate always has an earlier original to copy
+    count = int(round(rows * ratio))
+
+    candidates = np.arange(1, rows)
+
+    if exclude is not None and len(exclude):
+        candidates = np.setdiff1d(candidates, exclude)
+
+    count = min(count, len(candidates))
+
+    return np.sort(rng.choice(candidates, count, replace=False)) if count else np.array([], dtype=int)
+
+
+def _copy_earlier(rng, df, positions, columns):
+
+    # overwrite the key columns of positions with those of an earlier row
+    originals = (rng.random(len(positions)) * positions).astype(int)
+
+    for column in columns:
+        df.loc[positions, column] = df[column].to_numpy()[originals]
+
+
+def _corrupt(df, positions, corruptions):
+
+    # round-robin over (column, bad value) so every kind of error shows up
+    df[[column for column, _ in corruptions]] = df[[column for column, _ in corruptions]].astype(object)
+
+    for i, (column, value) in enumerate(corruptions):
+        df.loc[positions[i::len(corruptions)], column] = value
+
+
+# ============================
+# GENERATORS
+# ============================
+
+def generate_plants(rows, duplicate_ratio=0.0, invalid_ratio=0.0, seed=0):
+
+    # plant master rows in the upload layout; duplicates repeat an
+    # earlier plant_code, invalid rows break one field each
+    rng = np.random.default_rng(seed)
+
+    numbers = np.arange(1, rows + 1)
+
+    states = np.array(list(STATES))
+    state = states[rng.integers(0, len(states), rows)]
+
+    district = np.array([
+        STATES[name][index] for name, index in zip(state, rng.integers(0, 4, rows))
+    ])
+
+    df = pd.DataFrame({
+        "plant_code": _codes("PLT", numbers),
+        "plant_name": _codes("Plant ", numbers),
+        "type_id": rng.integers(1, 3, rows),
+        "location": district,
+        "state": state,
+        "district": district,
+        "status": np.where(rng.random(rows) < 0.05, "RETIRED", "ACTIVE"),
+        "installed_capacity_mw": rng.uniform(1, 2000, rows).round(2),
+        "implementing_agency": np.array(AGENCIES)[rng.integers(0, len(AGENCIES), rows)],
+        "sector": np.array(SECTORS)[rng.integers(0, len(SECTORS), rows)],
+        "commissioning_date": _dates(rng, rows)
+    })
+
+    duplicates = _pick_rows(rng, rows, duplicate_ratio)
+
+    _copy_earlier(rng, df, duplicates, ["plant_code", "plant_name"])
+
+    invalid = _pick_rows(rng, rows, invalid_ratio, exclude=duplicates)
+
+    _corrupt(df, invalid, [
+        ("plant_name", None),
+        ("type_id", "solar"),
+        ("status", "UNKNOWN"),
+        ("installed_capacity_mw", "n/a")
+    ])
+
+    return df
+
+
+def plants_for_units(rows):
+
+    # how many plants a unit file of rows rows spreads over
+    return max(1, rows // 4)
+
+
+def generate_units(rows, duplicate_ratio=0.0, invalid_ratio=0.0, seed=0):
+
+    # unit master rows naming their plant by plant_code, spread over the
+    # plants of generate_plants(plants_for_units(rows)); invalid rows
+    # include plant codes that do not exist
+    rng = np.random.default_rng(seed + 1)
+
+    plants = plants_for_units(rows)
+
+    numbers = np.arange(rows)
+
+    df = pd.DataFrame({
+        "plant_code": _codes("PLT", numbers % plants + 1),
+        "unit_code": _codes("U", numbers // plants + 1, width=3),
+        "unit_capacity_mw": rng.uniform(1, 800, rows).round(2),
+        "commissioning_date": _dates(rng, rows),
+        "status": np.array(["ACTIVE", "ACTIVE", "ACTIVE", "MAINTENANCE", "RETIRED"])[rng.integers(0, 5, rows)]
+    })
+
+    duplicates = _pick_rows(rng, rows, duplicate_ratio)
+
+    _copy_earlier(rng, df, duplicates, ["plant_code", "unit_code"])
+
+    invalid = _pick_rows(rng, rows, invalid_ratio, exclude=duplicates)
+
+    _corrupt(df, invalid, [
+        ("plant_code", "PLT-MISSING"),
+        ("unit_capacity_mw", "n/a"),
+        ("status", "BROKEN"),
+        ("unit_code", None)
+    ])
+
+    return df
+
+
+GENERATORS = {
+    "plant": generate_plants,
+    "unit": generate_units
+}
+
+
+# ============================
+# WRITERS
+# ============================
+
+def write_frame(df, path, sheet_name="Sheet1"):
+
+    # csv through pandas; xlsx through a write-only openpyxl workbook,
+    # which streams rows instead of building the sheet in memory
+    if path.suffix == ".csv":
+        df.to_csv(path, index=False)
+        return path
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+
+    sheet.append(list(df.columns))
+
+    for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+        sheet.append(row)
+
+    workbook.save(path)
+
+    return path
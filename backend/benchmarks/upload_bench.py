@@ -0,0 +1,409 @@
+import argparse
+from datetime import datetime
+import json
+from pathlib import Path
+import platform
+import threading
+import time
+
+from app.core.config import UPLOAD_CHUNK_ROWS, BULK_INSERT_BATCH_SIZE
+from app.core.database import SessionLocal
+from app.services.ingestion_spec import get_spec
+from app.services.mas_upload_services import (
+    normalize_columns,
+    preview_upload,
+    confirm_upload,
+    upload_plants,
+    upload_units
+)
+from app.utils.file_parser import read_file
+from app.utils.stage_timer import current_rss
+
+from benchmarks.bench_db import bind_database, reset_database
+from benchmarks.synthetic_data import GENERATORS, plants_for_units, write_frame
+
+
+# function-level timing of the upload paths on synthetic files, run
+# from the backend folder:
+#   python -m benchmarks.upload_bench --sizes 1k,100k --formats csv,xlsx
+#   python -m benchmarks.upload_bench --sizes 1m --formats csv --baseline old.json
+# every run drops and recreates the tables of --database-url, so point
+# it at a scratch database (the default is a SQLite file in --data-dir)
+
+
+TARGETS = [
+    "read_file",
+    "normalize_columns",
+    "preview_upload",
+    "confirm_upload",
+    "upload_plants",
+    "upload_units"
+]
+
+# the legacy uploaders each serve one category
+LEGACY_TARGETS = {
+    "upload_plants": "plant",
+    "upload_units": "unit"
+}
+
+MB = 1024 * 1024
+
+
+# ============================
+# HELPERS
+# ============================
+
+def parse_size(text):
+
+    text = text.strip().lower()
+
+    for suffix, factor in (("k", 1000), ("m", 1000000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+
+    return int(text)
+
+
+class BenchFile:
+
+    # the two attributes the upload services read from an UploadFile
+
+    def __init__(self, path):
+
+        self.filename = path.name
+        self.file = open(path, "rb")
+
+
+    def close(self):
+
+        self.file.close()
+
+
+class PeakRss:
+
+    # samples RSS on a thread while the block runs; ru_maxrss is a
+    # process-lifetime peak and cannot be scoped to one call
+
+    def __init__(self, interval=0.01):
+
+        self.interval = interval
+        self.baseline = None
+        self.peak = None
+
+        self._stop = threading.Event()
+        self._thread = None
+
+
+    def _sample(self):
+
+        rss = current_rss()
+
+        if rss is not None:
+            self.peak = max(self.peak or 0, rss)
+
+
+    def _run(self):
+
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+
+    def __enter__(self):
+
+        self.baseline = current_rss()
+        self.peak = self.baseline
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+        return self
+
+
+    def __exit__(self, *exc):
+
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+        return False
+
+
+# ============================
+# DATA FILES
+# ============================
+
+def data_file(data_dir, category, rows, file_format, duplicate_ratio, invalid_ratio, seed):
+
+    # generated once per parameter set and reused by later runs
+    name = f"{category}_{rows}_d{duplicate_ratio}_i{invalid_ratio}_s{seed}.{file_format}"
+
+    path = data_dir / name
+
+    if not path.exists():
+
+        df = GENERATORS[category](rows, duplicate_ratio, invalid_ratio, seed)
+
+        write_frame(df, path, sheet_name=f"{category}s")
+
+    return path
+
+
+# ============================
+# MEASURE
+# ============================
+
+def _outcome(result):
+
+    # the counts worth keeping from whatever the target returned
+    if hasattr(result, "shape"):
+        return {"rows": int(result.shape[0]), "columns": int(result.shape[1])}
+
+    keys = (
+        "status",
+        "total_rows",
+        "valid_rows",
+        "invalid_rows",
+        "duplicate_rows",
+        "inserted",
+        "failed",
+        "rows_inserted"
+    )
+
+    return {key: result[key] for key in keys if key in result}
+
+
+def measure(call):
+
+    with PeakRss() as rss:
+
+        started = time.perf_counter()
+
+        try:
+            result = _outcome(call())
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+
+        seconds = time.perf_counter() - started
+
+    return seconds, rss, result
+
+
+def run_target(engine, target, category, path, rows):
+
+    # one timed call; setup (database reset, the frame for
+    # normalize_columns) happens outside the timed block
+    spec = get_spec(category)
+
+    frame = None
+
+    if target == "normalize_columns":
+
+        upload = BenchFile(path)
+
+        try:
+            frame = read_file(upload)
+        finally:
+            upload.close()
+
+    if target in ("preview_upload", "confirm_upload") or target in LEGACY_TARGETS:
+        reset_database(engine, plants_for_units(rows) if category == "unit" else 0)
+
+    upload = BenchFile(path)
+
+    db = SessionLocal()
+
+    calls = {
+        "read_file": lambda: read_file(upload),
+        "normalize_columns": lambda: normalize_columns(frame, spec),
+        "preview_upload": lambda: preview_upload(upload, category, db),
+        "confirm_upload": lambda: confirm_upload(upload, category, db),
+        "upload_plants": lambda: upload_plants(upload, db),
+        "upload_units": lambda: upload_units(upload, db)
+    }
+
+    try:
+        seconds, rss, result = measure(calls[target])
+
+    finally:
+        db.close()
+        upload.close()
+
+    return {
+        "target": target,
+        "category": category,
+        "format": path.suffix.lstrip("."),
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+        "peak_rss_mb": round(rss.peak / MB, 1) if rss.peak else None,
+        "rss_growth_mb": round((rss.peak - rss.baseline) / MB, 1) if rss.peak and rss.baseline else None,
+        "result": result
+    }
+
+
+def _run_key(run):
+
+    return run["target"], run["category"], run["format"], run["rows"]
+
+
+def best_runs(runs):
+
+    # fastest repeat of each target / category / format / size
+    best = {}
+
+    for run in runs:
+
+        key = _run_key(run)
+
+        if key not in best or run["seconds"] < best[key]["seconds"]:
+            best[key] = run
+
+    return list(best.values())
+
+
+# ============================
+# REPORT
+# ============================
+
+def print_runs(runs, baseline=None, header=True):
+
+    previous = {}
+
+    if baseline:
+        previous = {_run_key(run): run for run in baseline["runs"]}
+
+    if header:
+
+        columns = f"{'target':<18} {'category':<8} {'format':<6} {'rows':>9} {'seconds':>9} {'rows/s':>11} {'peak MB':>8}"
+
+        if previous:
+            columns += f" {'vs base':>8}"
+
+        print(columns)
+
+    for run in runs:
+
+        line = (
+            f"{run['target']:<18} {run['category']:<8} {run['format']:<6} {run['rows']:>9} "
+            f"{run['seconds']:>9.3f} {run['rows_per_sec'] or 0:>11.0f} {run['peak_rss_mb'] or 0:>8.0f}"
+        )
+
+        old = previous.get(_run_key(run))
+
+        if old and run["seconds"]:
+            line += f" {old['seconds'] / run['seconds']:>7.2f}x"
+
+        if "error" in run["result"]:
+            line += f"  {run['result']['error'][:60]}"
+
+        print(line)
+
+
+# ============================
+# MAIN
+# ============================
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Time the upload functions on synthetic master files")
+
+    parser.add_argument("--sizes", default="1k,100k", help="comma separated row counts, e.g. 1k,100k,1m")
+    parser.add_argument("--formats", default="csv,xlsx")
+    parser.add_argument("--categories", default="plant,unit")
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument("--duplicate-ratio", type=float, default=0.02)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the fastest is reported")
+    parser.add_argument("--data-dir", type=Path, default=Path("benchmarks/data"))
+    parser.add_argument("--database-url", help="scratch database, its tables are dropped (default: SQLite in --data-dir)")
+    parser.add_argument("--output", type=Path, help="results JSON (default: benchmarks/results/upload-<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier results JSON to compare against")
+
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    formats = [name.strip() for name in args.formats.split(",")]
+    categories = [name.strip() for name in args.categories.split(",")]
+    targets = [name.strip() for name in args.targets.split(",")]
+
+    unknown = set(targets) - set(TARGETS)
+
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+
+    args.data_dir.mkdir(parents=True, exist_ok=True)
+
+    url = args.database_url or f"sqlite:///{(args.data_dir / 'bench.db').resolve()}"
+
+    engine = bind_database(url)
+
+    runs = []
+
+    for category in categories:
+
+        for file_format in formats:
+
+            for rows in sizes:
+
+                path = data_file(
+                    args.data_dir,
+                    category,
+                    rows,
+                    file_format,
+                    args.duplicate_ratio,
+                    args.invalid_ratio,
+                    args.seed
+                )
+
+                # the legacy uploaders reject the whole file on any bad
+                # row, so they get the clean variant
+                clean_path = data_file(args.data_dir, category, rows, file_format, 0.0, 0.0, args.seed)
+
+                for target in targets:
+
+                    if LEGACY_TARGETS.get(target, category) != category:
+                        continue
+
+                    for _ in range(args.repeat):
+
+                        run = run_target(
+                            engine,
+                            target,
+                            category,
+                            clean_path if target in LEGACY_TARGETS else path,
+                            rows
+                        )
+
+                        runs.append(run)
+
+                        print_runs([run], header=not runs[:-1])
+
+    results = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": engine.dialect.name,
+        "chunk_rows": UPLOAD_CHUNK_ROWS,
+        "insert_batch_size": BULK_INSERT_BATCH_SIZE,
+        "duplicate_ratio": args.duplicate_ratio,
+        "invalid_ratio": args.invalid_ratio,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "runs": best_runs(runs)
+    }
+
+    output = args.output or Path("benchmarks/results") / f"upload-{datetime.now():%Y%m%d-%H%M%S}.json"
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, default=str))
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+
+    print()
+    print_runs(results["runs"], baseline)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+-- create_all only creates missing tables, it never alters existing ones.
+-- Databases created before the background ingestion jobs and the
+-- content-hash check need these columns added by hand (MySQL):
+
+ALTER TABLE file_ingestion_log
+    ADD COLUMN content_hash VARCHAR(64) NULL AFTER file_size_kb,
+    ADD COLUMN rows_processed INT NULL DEFAULT 0 AFTER rows_inserted,
+    ADD COLUMN started_at TIMESTAMP NULL AFTER uploaded_at,
+    ADD COLUMN finished_at TIMESTAMP NULL AFTER started_at,
+    ADD INDEX ix_file_ingestion_log_content_hash (content_hash);
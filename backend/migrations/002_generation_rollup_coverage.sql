@@ -0,0 +1,9 @@
+-- The rollups now use a full day (or month) of capacity as the PLF
+-- denominator and count the readings behind each row separately.
+-- Existing monthly rollup tables need the new column (MySQL):
+
+ALTER TABLE generation_monthly_rollup
+    ADD COLUMN blocks INT NULL AFTER days;
+
+-- then recompute the stored rows over the span already loaded, e.g.
+--   python -m app.commands.rebuild_rollups --start 2024-01-01 --end 2024-12-31
@@ -0,0 +1,12 @@
+-- create_all only creates missing tables, it never adds indexes to
+-- existing ones. Databases created before the keyset-paginated master
+-- listings need the filter indexes added by hand (MySQL); the names are
+-- the ones create_all gives a new database:
+
+CREATE INDEX ix_plant_master_type_id ON plant_master (type_id);
+CREATE INDEX ix_plant_master_district ON plant_master (district);
+CREATE INDEX ix_plant_master_state ON plant_master (state);
+CREATE INDEX ix_plant_master_status ON plant_master (status);
+
+CREATE INDEX ix_unit_master_plant_id ON unit_master (plant_id);
+CREATE INDEX ix_unit_master_status ON unit_master (status);
@@ -0,0 +1,113 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.services.drop_analysis_service import (
+    BLOCKS_PER_DAY,
+    build_grid,
+    flag_drops,
+    rolling_baseline,
+    unit_events
+)
+
+
+UnitDetails = namedtuple("UnitDetails", "unit_id unit_code unit_capacity_mw plant_id plant_name state")
+
+GRID_START = datetime(2024, 1, 1)
+
+
+def _day_grid(values):
+
+    # one unit, every block of day d set to values[d]
+    return np.repeat(np.array(values, dtype=float), BLOCKS_PER_DAY)[None, :]
+
+
+def test_baseline_is_the_mean_of_the_previous_days():
+
+    baseline = rolling_baseline(_day_grid([1, 2, 3, 4]), baseline_days=2)
+
+    by_day = baseline.reshape(4, BLOCKS_PER_DAY)
+
+    # day 0 has no history, day 1 only one of its two days
+    assert np.isnan(by_day[0]).all()
+    assert np.isnan(by_day[1]).all()
+
+    assert np.allclose(by_day[2], 1.5)
+    assert np.allclose(by_day[3], 2.5)
+
+
+def test_one_day_baseline_is_usable():
+
+    by_day = rolling_baseline(_day_grid([1, 2, 3]), baseline_days=1).reshape(3, BLOCKS_PER_DAY)
+
+    assert np.allclose(by_day[1], 1)
+    assert np.allclose(by_day[2], 2)
+
+
+def test_missing_readings_stay_out_of_the_baseline():
+
+    grid = _day_grid([2, 4, 6, 0])
+
+    grid[0, BLOCKS_PER_DAY:2 * BLOCKS_PER_DAY] = np.nan
+
+    by_day = rolling_baseline(grid, baseline_days=3).reshape(4, BLOCKS_PER_DAY)
+
+    # two of the three days had readings, one short of MIN_BASELINE_DAYS
+    assert np.isnan(by_day[3]).all()
+
+
+def test_flags_only_below_the_threshold():
+
+    baseline = np.full((1, 4), 2.0)
+    grid = np.array([[1.0, 0.9, 2.0, np.nan]])
+
+    # 10 MW: 2.5 MWh a block, so the baseline runs at 80 %
+    flagged = flag_drops(grid, baseline, np.array([10.0]), threshold=0.5)
+
+    assert flagged.tolist() == [[False, True, False, False]]
+
+
+def test_small_units_and_small_drops_are_ignored():
+
+    baseline = np.full((1, 2), 2.0)
+    grid = np.array([[0.5, 0.5]])
+
+    # 1000 MW: the baseline is under 1 % of a block's capacity
+    assert not flag_drops(grid, baseline, np.array([1000.0])).any()
+
+    # unknown capacity never flags
+    assert not flag_drops(grid, baseline, np.array([np.nan])).any()
+
+
+def test_event_spanning_midnight_is_one_event():
+
+    baseline_days = 3
+    days = baseline_days + 2
+
+    stamps = np.array(
+        [np.datetime64(GRID_START + timedelta(minutes=15 * block), "ns") for block in range(days * BLOCKS_PER_DAY)]
+    )
+
+    mwh = np.full(len(stamps), 2.0)
+
+    # first analysed day 22:00 to the next day 02:00
+    drop_start = baseline_days * BLOCKS_PER_DAY + 88
+    mwh[drop_start:drop_start + 16] = 0.5
+
+    units, grid = build_grid(np.full(len(stamps), 7), stamps, mwh, GRID_START, days)
+
+    details = {7: UnitDetails(7, "U7", 10, 1, "Plant", "Goa")}
+
+    events = unit_events(units, grid, details, GRID_START, 0.5, baseline_days)
+
+    assert len(events) == 1
+
+    event = events[0]
+
+    assert event["start_ts"] == datetime(2024, 1, 4, 22, 0)
+    assert event["end_ts"] == datetime(2024, 1, 5, 2, 0)
+    assert event["blocks"] == 16
+    assert event["expected_mwh"] == 32.0
+    assert event["actual_mwh"] == 8.0
+    assert event["lost_mwh"] == 24.0
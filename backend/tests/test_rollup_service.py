@@ -0,0 +1,101 @@
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.database import Base, make_engine
+from app.models.master_model import Plant, PlantType, Unit
+from app.models.generation_model import GenerationReading
+from app.services.rollup_service import get_rollups, refresh_for_readings, track_readings
+
+
+@pytest.fixture
+def db():
+
+    engine = make_engine("sqlite://")
+
+    Base.metadata.create_all(bind=engine)
+
+    session = Session(engine)
+
+    session.add(PlantType(type_id=1, power_source="Solar", is_renewable=1))
+    session.add(Plant(plant_id=1, plant_code="P1", plant_name="A", type_id=1, state="Goa", district="North"))
+    session.add(Unit(unit_id=1, plant_id=1, unit_code="U1", unit_capacity_mw=10))
+    session.commit()
+
+    yield session
+
+    session.close()
+    engine.dispose()
+
+
+def _load(db, start, blocks, mwh=1.0):
+
+    # what an upload does: insert the readings, then refresh the rollups
+    # for the unit-days they span
+    rows = [
+        {"unit_id": 1, "reading_ts": start + timedelta(minutes=15 * block), "generation_mwh": mwh}
+        for block in range(blocks)
+    ]
+
+    db.execute(insert(GenerationReading), rows)
+
+    spans = {}
+
+    track_readings(pd.DataFrame(rows), spans)
+
+    refresh_for_readings(db, spans)
+
+    db.commit()
+
+
+def _rows(db, period):
+
+    return get_rollups(db, period, ["unit_id"], date(2024, 1, 1), date(2024, 1, 31))
+
+
+def test_daily_plf_uses_a_full_day_of_capacity(db):
+
+    # half of the day's 96 blocks
+    _load(db, datetime(2024, 1, 30), 48)
+
+    [row] = _rows(db, "daily")
+
+    assert row["generation_mwh"] == 48.0
+    assert row["capacity_mwh"] == 240.0
+    assert row["plf"] == 0.2
+    assert row["coverage"] == 0.5
+
+
+def test_monthly_plf_covers_every_day_of_the_month(db):
+
+    _load(db, datetime(2024, 1, 30), 48)
+
+    [row] = _rows(db, "monthly")
+
+    assert row["capacity_mwh"] == 10 * 24 * 31
+    assert row["plf"] == round(48 / 7440, 4)
+    assert row["coverage"] == round(48 / (96 * 31), 4)
+
+
+def test_second_upload_refreshes_the_same_rows(db):
+
+    _load(db, datetime(2024, 1, 30), 48)
+
+    # the other half of the day, then the next day
+    _load(db, datetime(2024, 1, 30, 12), 48 + 96, mwh=2.0)
+
+    daily = _rows(db, "daily")
+
+    assert [row["period"] for row in daily] == [date(2024, 1, 30), date(2024, 1, 31)]
+
+    assert daily[0]["generation_mwh"] == 48 + 96.0
+    assert daily[0]["coverage"] == 1.0
+    assert daily[0]["plf"] == 0.6
+
+    [monthly] = _rows(db, "monthly")
+
+    assert monthly["generation_mwh"] == 48 + 96 + 192.0
+    assert monthly["coverage"] == round(96 * 2 / (96 * 31), 4)
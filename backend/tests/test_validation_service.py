@@ -0,0 +1,46 @@
+from datetime import datetime
+import io
+
+from app.services.ingestion_spec import GENERATION_SPEC
+from app.services.mas_upload_services import normalize_columns
+from app.services.validation_service import coerce_chunk
+from app.utils.file_parser import iter_file_chunks
+
+
+class SpooledUpload:
+
+    def __init__(self, filename, text):
+
+        self.filename = filename
+        self.file = io.BytesIO(text.encode())
+
+
+def test_datetimes_survive_every_chunk():
+
+    # chunks after the first carry a file-wide index (25, 26, ...), which
+    # is where a 0..n-1 datetime array used to turn into all-missing
+    lines = ["unit_id,reading_ts,generation_mwh"]
+
+    for block in range(60):
+        lines.append(f"1,2024-01-01 {block // 4:02d}:{block % 4 * 15:02d},1.5")
+
+    upload = SpooledUpload("generation.csv", "\n".join(lines) + "\n")
+
+    chunks = list(iter_file_chunks(upload, chunk_rows=25))
+
+    assert len(chunks) == 3
+
+    stamps = []
+
+    for df in chunks:
+
+        typed, row_errors = coerce_chunk(normalize_columns(df, GENERATION_SPEC), GENERATION_SPEC)
+
+        assert row_errors.isna().all()
+        assert list(typed.index) == list(df.index)
+
+        stamps.extend(typed["reading_ts"])
+
+    assert all(type(stamp) is datetime for stamp in stamps)
+    assert stamps[0] == datetime(2024, 1, 1, 0, 0)
+    assert stamps[-1] == datetime(2024, 1, 1, 14, 45)